@@ -0,0 +1,103 @@
+import numpy as np
+
+
+class AggregateCube:
+    """
+    Player counts, totals and top contributor of every stat per team x position cell of a season
+
+    Built once with grouped reductions: the players are sorted by cell, totals are an np.add.reduceat over the
+    sorted stat matrix and each cell's top contributor is the first row of its group when sorted by value. Team
+    and position roll-ups are then answered from the (teams x positions x stats) arrays alone.
+
+    Attributes:
+        teams (list): Team of each first axis cell
+        positions (list): Position of each second axis cell
+        stats (list): Stat of each third axis cell
+        counts (np.ndarray): (teams x positions) number of players
+        totals (np.ndarray): (teams x positions x stats) sum of the players' values
+        top_values (np.ndarray): (teams x positions x stats) highest value of a player, nan for an empty cell
+        top_names (np.ndarray): (teams x positions x stats) name of that player ('' for an empty cell), ties go to
+                                the first in season order
+    """
+    def __init__(self, df, stats, values=None):
+        """
+        Initialize the AggregateCube and reduce the season into it
+
+        Parameters:
+        df: The season's data frame, giving each player's team, position and name
+        stats (list): Names of the stats
+        values (np.ndarray or None): (players x stats) values aligned with the rows of df (ie. scored fantasy
+                                     values), None to take the stat columns of df
+        """
+        team_column = df['team'].astype('category')
+        position_column = df['position'].astype('category')
+        self.teams = team_column.cat.categories.tolist()
+        self.positions = position_column.cat.categories.tolist()
+        self.stats = list(stats)
+        self.positions_index = {position: j for j, position in enumerate(self.positions)}
+        self.teams_index = {team: i for i, team in enumerate(self.teams)}
+        self.stats_index = {stat: k for k, stat in enumerate(self.stats)}
+        values = df[self.stats].to_numpy(dtype=np.float64) if values is None else np.asarray(values, np.float64)
+
+        #Cell of each player, then the first player of each filled cell once sorted by cell
+        shape = (len(self.teams), len(self.positions))
+        cells = team_column.cat.codes.to_numpy().astype(np.int64) * shape[1] + position_column.cat.codes.to_numpy()
+        order = np.argsort(cells, kind='stable')
+        sorted_cells = cells[order]
+        starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]][:len(cells)])
+        filled = sorted_cells[starts]
+
+        size = shape[0] * shape[1]
+        self.counts = np.bincount(cells, minlength=size).reshape(shape)
+        totals = np.zeros((size, len(self.stats)))
+        if len(cells):
+            totals[filled] = np.add.reduceat(values[order], starts, axis=0)
+        self.totals = totals.reshape(shape + (len(self.stats),))
+
+        #Top contributor of each stat: sorted by cell then highest value first (ties in season order)
+        names = df['name'].astype(str).to_numpy()
+        top_values = np.full((size, len(self.stats)), np.nan)
+        top_names = np.full((size, len(self.stats)), '', dtype=object)
+        for k in range(len(self.stats)):
+            ranked = np.lexsort((-values[:, k], cells))[starts]
+            top_values[filled, k] = values[ranked, k]
+            top_names[filled, k] = names[ranked]
+        self.top_values = top_values.reshape(self.totals.shape)
+        self.top_names = top_names.reshape(self.totals.shape)
+
+    def rollup(self, stat, positions, teams=None):
+        """
+        Gets the team x position cells of a stat
+
+        Parameters:
+        stat (str): The stat
+        positions (list): Positions of the second axis, in order. Positions missing from the cube are empty.
+        teams (list or None): Teams of the first axis, None or empty for every team of the cube
+
+        Returns:
+        dict: 'teams' and 'positions' (the axes), then (teams x positions) arrays: 'counts', 'totals', 'means'
+              (nan for an empty cell), 'top_values' and 'top_names'
+        """
+        k = self.stats_index[stat]
+        teams = [team for team in teams if team in self.teams_index] if teams else self.teams
+        rows = [self.teams_index[team] for team in teams]
+
+        #Positions missing from the cube point at an appended empty column
+        columns = [self.positions_index.get(position, len(self.positions)) for position in positions]
+
+        def take(cube, empty):
+            padded = np.concatenate([cube[rows], np.full((len(rows), 1) + cube.shape[2:], empty, cube.dtype)],
+                                    axis=1)
+            return padded[:, columns] if cube.ndim == 2 else padded[:, columns, k]
+
+        counts = take(self.counts, 0)
+        totals = take(self.totals, 0.0)
+        return {
+            'teams': teams,
+            'positions': list(positions),
+            'counts': counts,
+            'totals': totals,
+            'means': np.divide(totals, counts, out=np.full(totals.shape, np.nan), where=counts > 0),
+            'top_values': take(self.top_values, np.nan),
+            'top_names': take(self.top_names, ''),
+        }
@@ -0,0 +1,41 @@
+//UI reconfiguration callbacks run in the browser, registered by NHLController.register_clientside_callbacks
+//Each mirrors the server callback of the same name in controller.py
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        //Shows the season range slider and mode dropdown when "Seasons: range" is the selected year
+        update_season_range: function(select_year) {
+            return {'width': '40%', 'display': select_year === 'range' ? 'inline-block' : 'none'};
+        },
+
+        //Updates the slider's marks, max, min and step based on the selected graph (bars: 0-100, scatter: 0-500)
+        update_slider_val: function(select_graph) {
+            var max_val = select_graph !== 'scatter' ? 100 : 500;
+            var step_val = select_graph !== 'scatter' ? 10 : 50;
+            var marks_val = {};
+            for (var i = 0; i <= max_val; i += step_val) {
+                marks_val[i] = String(i);
+            }
+            return [marks_val, max_val, 0, step_val];
+        },
+
+        //Updates the stat dropdowns and shows/hides the secondary stat and fantasy scoring blocks
+        //stat_options holds the real ('real'), real counting ('counting') and fantasy ('fantasy') stat options
+        //embedded in the layout
+        update_dropdowns: function(select_data, select_graph, stat_options) {
+            //The team comparison graph shows one stat, and only the counting stats of the real statistics
+            var teams = select_graph === 'teams';
+            //The league presets graph shows the fantasy scoring inputs whatever data is selected
+            var options = select_data ? (teams ? stat_options.counting : stat_options.real) : stat_options.fantasy;
+            var presets = select_graph === 'presets';
+            var scatter = select_graph === 'scatter';
+            return [
+                options,
+                !select_data && !scatter && !teams,
+                scatter ? options : [],
+                {'width': '20%', 'display': scatter ? 'inline-block' : 'none'},
+                select_data && !presets ? {'width': '20%', 'display': 'none'}
+                                        : {'width': '50%', 'display': 'inline-block'}
+            ];
+        }
+    }
+});
@@ -0,0 +1,115 @@
+"""
+Team x position aggregate cube: build cost, roll-up latency against grouping the player rows, and exactness
+
+    python benchmarks/bench_cube.py [scale]
+
+Times building the cube of a season (once per season, and once per scoring for fantasy statistics), a roll-up of
+one stat from the cube next to the same team x position totals, means and top players from a pandas groupby of the
+season's rows, and the team comparison graph build. Runs on the newest bundled season, a pooled range of every
+season and, when a scale is given, a synthetic season with scale times the players (see
+bench_suite.synthetic_files).
+
+Then checks every stat of every bundled season's cube, real and fantasy, against the groupby and counts the cells
+whose count, total or top player's value differ.
+"""
+import sys
+import tempfile
+
+import numpy as np
+
+from bench_suite import synthetic_files
+from bench_utils import FILES, report, timed
+from aggregate_cube import AggregateCube
+from model import FantasyModel
+from nhl_app import NHLApp
+
+STATS = ['points', 'hits']
+
+
+def grouped(df, stat):
+    """
+    Gets the team x position counts, totals, means and top values of a stat by grouping the player rows
+
+    Returns:
+    pd.DataFrame: One row per filled (team, position) cell
+    """
+    return df.groupby(['team', 'position'], observed=True)[stat].agg(['count', 'sum', 'mean', 'max'])
+
+
+def mismatches(cube, df, stats):
+    """
+    Counts the cells of the cube differing from the groupby of the same rows
+
+    Returns:
+    int: Cells (over every stat) whose count, total or top value differ, or whose top player doesn't have it
+    """
+    bad = 0
+    for stat in stats:
+        expected = grouped(df, stat)
+        data = cube.rollup(stat, cube.positions)
+        for (team, position), row in expected.iterrows():
+            i, j = cube.teams_index[team], cube.positions_index[position]
+            top = df[(df['team'] == team) & (df['position'] == position) & (df['name'] == data['top_names'][i, j])]
+            if (data['counts'][i, j] != row['count'] or not np.isclose(data['totals'][i, j], row['sum'])
+                    or not np.isclose(data['top_values'][i, j], row['max'])
+                    or not np.isclose(top[stat].max(), row['max'])):
+                bad += 1
+        bad += int(data['counts'].sum() != len(df))
+    return bad
+
+
+def check(model):
+    """
+    Compares the real and default scoring fantasy cube of every bundled season with a pandas groupby
+
+    Returns:
+    tuple: (cells compared, cells differing)
+    """
+    cells = bad = 0
+    stats = [option['value'] for option in model.counting_options]
+    for year in model.store.seasons():
+        df = model.get_df(year)
+        season = model.score_season(year, model.f_scoring)
+        scored = df[['team', 'position', 'name']].copy()
+        scored[model.f_categories] = season.values
+        for cube, frame, columns in ((model.get_cube(year), df, stats),
+                                     (model.get_fantasy_cube(year, model.f_scoring), scored, model.f_categories)):
+            cells += len(grouped(frame, columns[0])) * len(columns)
+            bad += mismatches(cube, frame, columns)
+    return cells, bad
+
+
+def run(files, name, years, repeat=7, number=20):
+    nhl_app = NHLApp(files, cache_dir=None, preload='eager')
+    model = nhl_app.fantasy_model
+    controller = nhl_app.controller
+    controller.figure_cache = None
+    stats = [option['value'] for option in model.counting_options]
+    for year in years:
+        df = model.get_df(year)
+        print(f'{name} {year}: {len(df)} players')
+        report('  build cube of every stat', timed(lambda: AggregateCube(df, stats), repeat, 1))
+        season = model.score_season(year, model.f_scoring)
+        report('  build fantasy cube of a scoring',
+               timed(lambda: AggregateCube(season.base, model.f_categories, season.values), repeat, 1))
+        cube = model.get_cube(year)
+        for stat in STATS:
+            report(f'  {stat}: roll-up from the cube', timed(lambda: cube.rollup(stat, model.positions), repeat,
+                                                               number))
+            report(f'  {stat}: groupby of the player rows', timed(lambda: grouped(df, stat), repeat, number))
+            report(f'  {stat}: team comparison graph',
+                   timed(lambda: controller.build_figure(True, year, 'teams', None, None, stat, None, 20,
+                                                         model.f_scoring), repeat, number))
+
+
+def main(scale=None):
+    run(FILES, 'bundled', ['2024', '2020-2024:total'])
+    if scale:
+        with tempfile.TemporaryDirectory() as directory:
+            run(synthetic_files(scale, directory), f'synthetic {scale}x', ['2024'])
+    cells, bad = check(FantasyModel(FILES))
+    print(f'{bad} of {cells} cube cells differ from the pandas groupby')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,45 @@
+"""
+Cost of the derived per game, per 60 minute and percentile columns: once per season load, nothing per interaction
+
+    python benchmarks/bench_derived.py
+
+Times deriving the columns of a season (part of SeasonStore.compact, skipped when the season's snapshot is read)
+and a season load from a snapshot, then the graph build of each counting stat next to its derived versions. Derived
+stats are ranked from the same pre-built rank orders as the counting stats, so their builds should take the same
+time.
+"""
+import tempfile
+
+import pandas as pd
+
+from bench_utils import FILES, report, timed
+from derived_stats import DERIVED, derived_columns
+from nhl_app import NHLApp
+from season_store import SeasonStore, SnapshotCache
+
+STATS = ['points', 'hits']
+
+
+def main(repeat=7, number=20):
+    raw = pd.read_csv(f'{FILES[0]}.csv')
+    report('derive columns of a season', timed(lambda: derived_columns(raw), repeat, number))
+
+    with tempfile.TemporaryDirectory() as directory:
+        SeasonStore(FILES[:1], SnapshotCache(directory)).get('2024')
+        report('load a season from its snapshot',
+               timed(lambda: SeasonStore(FILES[:1], SnapshotCache(directory)).get('2024'), repeat, number))
+
+    nhl_app = NHLApp(FILES, cache_dir=None, preload='eager')
+    controller = nhl_app.controller
+    controller.figure_cache = None
+    scoring = nhl_app.fantasy_model.f_scoring
+    for graph, slider in (('bar', 50), ('scatter', 500)):
+        for stat in STATS:
+            for name in [stat] + [f'{stat}{suffix}' for suffix in DERIVED]:
+                report(f'{graph} graph of {name}',
+                       timed(lambda: controller.build_figure(True, '2024', graph, None, None, name, 'goals', slider,
+                                                             scoring), repeat, number))
+
+
+if __name__ == '__main__':
+    main()
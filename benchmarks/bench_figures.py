@@ -0,0 +1,61 @@
+"""
+Figure construction: plotly.express vs. the direct graph_objects builders (and their WebGL scatter mode)
+
+    python benchmarks/bench_figures.py
+
+Builds the real and fantasy bar and scatter graphs at the slider maximums (100 bars, 500 scatter points) with each
+figure mode, reporting the server build time, the JSON serialization time and the payload size, and checks every
+mode plots the same x/y values as plotly.express.
+"""
+import json
+
+from bench_utils import FILES, report, timed
+from figure_builders import FIGURE_MODES
+from nhl_app import NHLApp
+
+MODES = ['express', 'graph_objects', 'webgl']
+
+#(name, data_selected, graph, stat, stat2, slider)
+CASES = [
+    ('real bar 100', True, 'bar', 'points', None, 100),
+    ('real scatter 500', True, 'scatter', 'points', 'shots_on_goal', 500),
+    ('fantasy stacked bar 100', False, 'bar', ['f_goals', 'f_assists', 'f_hits'], None, 100),
+    ('fantasy scatter 500', False, 'scatter', 'f_points', 'f_sogs', 500),
+]
+
+
+def traces(fig):
+    """
+    Gets the plotted x/y values of each trace, decoded from the figure's JSON
+    """
+    data = json.loads(fig.to_json())['data']
+    return [(trace['x'], trace['y']) for trace in data]
+
+
+def main(year='2024', repeat=5, number=20):
+    nhl_app = NHLApp(FILES, preload='eager')
+    controller = nhl_app.controller
+    scoring = nhl_app.fantasy_model.f_scoring
+
+    mismatches = 0
+    for name, data_selected, graph, stat, stat2, slider in CASES:
+        def build():
+            return controller.build_figure(data_selected, year, graph, None, None, stat, stat2, slider, scoring)
+
+        expected = None
+        for mode in MODES:
+            controller.figures = FIGURE_MODES[mode]()
+            fig = build()
+            if expected is None:
+                expected = traces(fig)
+            else:
+                mismatches += traces(fig) != expected
+
+            report(f'{name} {mode} build', timed(build, repeat, number))
+            report(f'{name} {mode} to_json', timed(fig.to_json, repeat, number))
+            print(f'{name} {mode} payload: {len(fig.to_json()):,} bytes')
+    print(f'figure modes plotting different values than plotly.express: {mismatches}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Best lineup latency on full seasons, and exactness against a brute force search on small instances
+
+    python benchmarks/bench_lineup.py [scale]
+
+Times NHLModel.best_lineup by fantasy points with the default roster and a larger one, with no team cap and caps
+of 1-3 players per team, on the newest bundled season, a pooled range of every season and, when a scale is given,
+a synthetic season with scale times the players (see bench_suite.synthetic_files).
+
+Then solves random small instances (12 players, 3 teams, 5-6 slots including flex slots, random team caps) both
+with the LineupOptimizer and by trying every subset of players, and counts the instances where the best totals
+differ. Exits with status 1 when any instance differs.
+"""
+import itertools
+import sys
+import tempfile
+
+import numpy as np
+
+from bench_suite import synthetic_files
+from bench_utils import FILES, report, timed
+from lineup import LineupOptimizer
+from model import FantasyModel
+
+LARGE_ROSTER = {
+    'C': (3, ('C',)),
+    'LW': (3, ('L',)),
+    'RW': (3, ('R',)),
+    'D': (5, ('D',)),
+    'F': (2, ('C', 'L', 'R')),
+    'UTIL': (2, ('C', 'L', 'R', 'D')),
+}
+SMALL_ROSTERS = [
+    {'C': (1, ('C',)), 'W': (1, ('L', 'R')), 'D': (2, ('D',)), 'UTIL': (1, ('C', 'L', 'R', 'D'))},
+    {'F': (3, ('C', 'L', 'R')), 'D': (2, ('D',)), 'UTIL': (1, ('C', 'L', 'R', 'D'))},
+    {'C': (2, ('C',)), 'LW': (1, ('L',)), 'RW': (1, ('R',)), 'D': (1, ('D',))},
+]
+
+
+def assignable(players, positions, slots):
+    """
+    Checks every player can be given a different slot accepting their position (augmenting path matching)
+    """
+    accepted = [slot for slot, (count, _) in slots.items() for _ in range(count)]
+    owner = [None] * len(accepted)
+
+    def assign(player, seen):
+        for s, slot in enumerate(accepted):
+            if positions[player] in slots[slot][1] and s not in seen:
+                seen.add(s)
+                if owner[s] is None or assign(owner[s], seen):
+                    owner[s] = player
+                    return True
+        return False
+    return all(assign(player, set()) for player in players)
+
+
+def brute_force(values, positions, teams, slots, team_cap):
+    """
+    Gets the best total of the largest rosters the constraints allow, trying every subset of players
+
+    Returns:
+    tuple: (players picked, best total)
+    """
+    for size in range(min(len(values), sum(count for count, _ in slots.values())), -1, -1):
+        best = None
+        for players in itertools.combinations(range(len(values)), size):
+            if team_cap is not None and max([sum(teams[p] == team for p in players) for team in set(teams)],
+                                            default=0) > team_cap:
+                continue
+            if assignable(players, positions, slots):
+                total = sum(values[p] for p in players)
+                best = total if best is None else max(best, total)
+        if best is not None:
+            return size, best
+    return 0, 0.0
+
+
+def check(instances=300, seed=0):
+    """
+    Compares the optimizer against brute_force on random small instances
+
+    Returns:
+    int: Number of instances where the number of players picked or the best total differ
+    """
+    rng = np.random.default_rng(seed)
+    mismatches = 0
+    for _ in range(instances):
+        values = rng.normal(10, 5, size=12).round(1)
+        positions = rng.choice(['C', 'L', 'R', 'D'], size=12)
+        teams = rng.choice(['AAA', 'BBB', 'CCC'], size=12)
+        slots = SMALL_ROSTERS[rng.integers(len(SMALL_ROSTERS))]
+        team_cap = [None, 1, 2, 3][rng.integers(4)]
+
+        picked, _ = LineupOptimizer(slots, team_cap).solve(values, positions, teams)
+        size, best = brute_force(values, positions, teams, slots, team_cap)
+        if len(picked) != size or not np.isclose(values[picked].sum(), best):
+            mismatches += 1
+    return mismatches
+
+
+def run(files, name, years, repeat=7):
+    model = FantasyModel(files)
+    for year in years:
+        values = model.score_season(year, model.f_scoring).column('f_points')
+        print(f'{name} {year}: {len(values)} players')
+        for roster_name, slots in (('default roster', None), ('large roster', LARGE_ROSTER)):
+            for team_cap in (None, 1, 2, 3):
+                optimizer = LineupOptimizer(slots, team_cap)
+                report(f'  {roster_name}, team cap {team_cap}',
+                       timed(lambda: model.best_lineup(year, values, optimizer=optimizer), repeat))
+
+
+def main(scale=None):
+    run(FILES, 'bundled', ['2024', '2020-2024:total'])
+    if scale:
+        with tempfile.TemporaryDirectory() as directory:
+            run(synthetic_files(scale, directory), f'synthetic {scale}x', ['2024'])
+    mismatches = check()
+    print(f'{mismatches} of 300 small instances differ from brute force')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
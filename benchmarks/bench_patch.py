@@ -0,0 +1,104 @@
+"""
+Graph callback responses: full figures vs. partial (Patch) updates, per interaction type
+
+    python benchmarks/bench_patch.py
+
+Each interaction changes one input from a displayed figure. It is posted once without a figure_state (the server
+sends the whole figure, as before the graph was kept in the layout) and once with the displayed figure's state
+(the server sends a Patch when the structure is unchanged). Reports the response size and the round trip through
+the Flask test client (no network), and checks the patch applied to the displayed figure gives the full figure's
+traces and title. The figure cache is disabled so every request builds its figure.
+"""
+import copy
+import json
+import statistics
+import time
+
+from bench_utils import FILES, callback_payload
+from nhl_app import NHLApp
+
+GRAPH = '..output_graph.figure...figure_state.data..'
+
+BASE = {
+    'select_data.value': True, 'select_year.value': '2024', 'select_graph.value': 'scatter',
+    'select_teams.value': None, 'select_position.value': None, 'select_stat.value': 'points',
+    'select_stat2.value': 'shots_on_goal', 'slider_value.value': 200, 'select_seasons.value': [2020, 2024],
+    'select_season_mode.value': 'total',
+}
+FANTASY = dict(BASE, **{'select_data.value': False, 'select_graph.value': 'bar',
+                        'select_stat.value': ['f_points'], 'slider_value.value': 50})
+
+#(interaction, displayed selections, changed input -> new value)
+INTERACTIONS = [
+    ('slider move', BASE, {'slider_value.value': 300}),
+    ('team filter', BASE, {'select_teams.value': ['TOR', 'BOS']}),
+    ('season change', BASE, {'select_year.value': '2023'}),
+    ('fantasy weight change', FANTASY, {'scoring_store.data': {'f_goal': 3.0}}),
+    ('stat change (new structure)', BASE, {'select_stat.value': 'goals'}),
+]
+
+
+def apply_patch(figure, patch):
+    """
+    Applies the Assign operations of a serialized Patch to a figure, like the browser does
+    """
+    figure = copy.deepcopy(figure)
+    for operation in patch['operations']:
+        assert operation['operation'] == 'Assign', operation
+        target = figure
+        for location in operation['location'][:-1]:
+            target = target.setdefault(location, {}) if isinstance(target, dict) else target[location]
+        target[operation['location'][-1]] = operation['params']['value']
+    return figure
+
+
+def visible(figure):
+    """
+    Gets the values and title a figure displays
+    """
+    return [(trace.get('x'), trace.get('y'), trace.get('customdata'), trace.get('marker', {}).get('color'))
+            for trace in figure['data']], figure['layout']['title']['text']
+
+
+def main(repeat=20):
+    nhl_app = NHLApp(FILES, preload='eager')
+    nhl_app.controller.figure_cache = None
+    dash_app = nhl_app.app
+    client = dash_app.server.test_client()
+    scoring = nhl_app.fantasy_model.f_scoring
+
+    def post(values, figure_state):
+        payload = callback_payload(dash_app, GRAPH, values)
+        payload['state'][0]['value'] = figure_state
+        start = time.perf_counter()
+        response = client.post('/_dash-update-component', json=payload)
+        elapsed = time.perf_counter() - start
+        return response.get_data(), elapsed
+
+    mismatches = 0
+    for name, displayed, change in INTERACTIONS:
+        displayed = dict(displayed, **{'scoring_store.data': scoring})
+        changed = dict(displayed, **change)
+        if 'scoring_store.data' in change:
+            changed['scoring_store.data'] = dict(scoring, **change['scoring_store.data'])
+
+        shown = json.loads(post(displayed, None)[0])['response']
+        full_body, _ = post(changed, None)
+        patch_body, _ = post(changed, shown['figure_state']['data'])
+
+        #The patched figure must show what the full figure shows
+        full = json.loads(full_body)['response']['output_graph']['figure']
+        update = json.loads(patch_body)['response']['output_graph']['figure']
+        if update.get('__dash_patch_update'):
+            update = apply_patch(shown['output_graph']['figure'], update)
+        mismatches += visible(update) != visible(full)
+
+        full_ms = statistics.median(post(changed, None)[1] for _ in range(repeat)) * 1000
+        patch_ms = statistics.median(post(changed, shown['figure_state']['data'])[1] for _ in range(repeat)) * 1000
+        print(f'{name:<30} full {len(full_body):>8,} bytes {full_ms:>8.2f} ms   '
+              f'patch {len(patch_body):>8,} bytes {patch_ms:>8.2f} ms')
+    print(f'patched figures differing from the full figure: {mismatches}')
+
+
+if __name__ == '__main__':
+    main()
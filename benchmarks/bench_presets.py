@@ -0,0 +1,69 @@
+"""
+Scoring K fantasy scorings of a season: K sequential calc_fantasy_stats calls vs. one batched score_presets
+
+    python benchmarks/bench_presets.py [scale]
+
+Sequential scoring is what comparing K leagues cost before: K calls to FantasyModel.calc_fantasy_stats, each writing
+all 13 fantasy columns, then ranking each scoring's f_points. Batched scoring is FantasyModel.score_presets, one
+(players x stats) @ (stats x K) product and a column-wise rank. Runs on the newest bundled season, and on a
+synthetic season with scale times the players when a scale is given (see bench_suite.synthetic_files).
+
+Also checks the batched totals and ranks are identical to the sequential ones (both columns should read 0).
+"""
+import sys
+import tempfile
+
+import numpy as np
+
+from bench_suite import synthetic_files
+from bench_utils import FILES, summarize, timed
+from model import FantasyModel
+from season_index import rank_order
+
+KS = [1, 2, 4, 8, 16, 32, 64, 128]
+
+
+def sequential(model, df, scorings):
+    """
+    Scores and ranks each scoring with its own calc_fantasy_stats call
+
+    Returns:
+    tuple: (totals, ranks) (players x K) arrays
+    """
+    totals = np.empty((len(df), len(scorings)))
+    ranks = np.empty((len(df), len(scorings)), dtype=np.int64)
+    for k, scoring in enumerate(scorings):
+        totals[:, k] = model.calc_fantasy_stats(df, scoring)['f_points'].to_numpy()
+        ranks[rank_order(totals[:, k]), k] = np.arange(1, len(df) + 1)
+    return totals, ranks
+
+
+def run(files, name, repeat=5):
+    model = FantasyModel(files)
+    season = model.store.seasons()[0]
+    df = model.get_df(season).copy()
+    rng = np.random.default_rng(0)
+    print(f'{name}: {len(df)} players')
+    print(f"{'K':>5}{'sequential ms':>16}{'batched ms':>14}{'speedup':>10}{'max |diff|':>14}{'rank diffs':>12}")
+    for k in KS:
+        scorings = [dict(model.f_scoring)] + [dict(zip(model.f_labels, rng.normal(size=len(model.f_labels)).round(2)))
+                                              for _ in range(k - 1)]
+        seq = summarize(timed(lambda: sequential(model, df, scorings), repeat))['median_ms']
+        batched = summarize(timed(lambda: model.score_presets(season, scorings), repeat, 5))['median_ms']
+
+        totals, ranks = model.score_presets(season, scorings)
+        expected_totals, expected_ranks = sequential(model, df, scorings)
+        diff = np.abs(totals - expected_totals).max()
+        rank_diffs = int((ranks != expected_ranks).sum())
+        print(f'{k:>5}{seq:>16.3f}{batched:>14.3f}{seq / batched:>9.1f}x{diff:>14.2e}{rank_diffs:>12}')
+
+
+def main(scale=None):
+    run(FILES, 'bundled')
+    if scale:
+        with tempfile.TemporaryDirectory() as directory:
+            run(synthetic_files(scale, directory), f'synthetic {scale}x')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""
+Top-N queries on real stats: filtered nlargest vs. the pre-built rank index
+
+    python benchmarks/bench_rank.py
+
+Runs across the slider range (10-500) with no filter, a position filter and a team + position filter, and
+checks both approaches pick the same players in the same order.
+"""
+from bench_utils import FILES, report, timed
+from model import NHLModel
+
+SLIDER_VALUES = [10, 50, 100, 200, 500]
+FILTERS = {
+    'all': (None, None),
+    'defence': (None, ['D']),
+    'TOR+BOS forwards': (['TOR', 'BOS'], ['C', 'L', 'R']),
+}
+
+
+def nlargest_top(df, stat, n, teams, positions):
+    """
+    The original filter + nlargest query
+    """
+    if teams:
+        df = df[df['team'].isin(teams)]
+    if positions:
+        df = df[df['position'].isin(positions)]
+    return df.nlargest(n, stat)
+
+
+def main(stat='points', repeat=5, number=50):
+    model = NHLModel(FILES)
+    df = model.get_df('2024')
+    index = model.get_index('2024')
+
+    mismatches = 0
+    for name, (teams, positions) in FILTERS.items():
+        for n in SLIDER_VALUES:
+            expected = nlargest_top(df, stat, n, teams, positions).index.tolist()
+            mismatches += df.index[index.top(stat, n, teams, positions)].tolist() != expected
+
+            report(f'nlargest {name} top {n}',
+                   timed(lambda: nlargest_top(df, stat, n, teams, positions), repeat, number))
+            report(f'rank index {name} top {n}',
+                   timed(lambda: index.top(stat, n, teams, positions), repeat, number))
+    print(f'rank index vs nlargest mismatching queries: {mismatches}')
+
+
+if __name__ == '__main__':
+    main()
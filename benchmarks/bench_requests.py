@@ -0,0 +1,115 @@
+"""
+Server callback requests per session: UI reconfiguration as server callbacks vs. clientside callbacks
+
+    python benchmarks/bench_requests.py
+
+Replays a scripted session (page load, then a sequence of interactions) the way the Dash renderer fires callbacks:
+every callback at page load, then each callback with a changed input, following outputs that are inputs of other
+callbacks. Callbacks registered as clientside run in the browser, every other fired callback is posted to the
+server through the Flask test client. Reports the requests and server time of the session for each mode.
+"""
+import time
+
+from bench_utils import FILES, callback_payload
+from nhl_app import NHLApp
+
+#(interaction, changed 'component_id.property' -> new value)
+SESSION = [
+    ('scatter plot', {'select_graph.value': 'scatter'}),
+    ('second stat', {'select_stat2.value': 'shots_on_goal'}),
+    ('slider', {'slider_value.value': 200}),
+    ('fantasy data', {'select_data.value': False, 'select_stat.value': 'f_points', 'select_stat2.value': 'f_goals'}),
+    ('year', {'select_year.value': '2023'}),
+    ('season range', {'select_year.value': 'range'}),
+    ('range mode', {'select_season_mode.value': 'per_game'}),
+    ('scoring value', {'f_goal.value': 3}),
+    ('bar graph', {'select_graph.value': 'bar', 'select_stat.value': ['f_points']}),
+    ('team filter', {'select_teams.value': ['TOR']}),
+]
+
+
+def layout_values(nhl_app):
+    """
+    Gets the initial value of every callback input and state from the layout
+    """
+    values = {}
+
+    def walk(component):
+        if hasattr(component, 'to_plotly_json'):
+            props = component.to_plotly_json()['props']
+            if 'id' in props:
+                for name, value in props.items():
+                    values[f"{props['id']}.{name}"] = value
+            children = props.get('children')
+            for child in children if isinstance(children, list) else [children]:
+                walk(child)
+    walk(nhl_app.view.serve_layout())
+    return values
+
+
+def replay(ui_callbacks):
+    """
+    Replays SESSION against an app registering its UI callbacks in the given mode
+
+    Returns:
+    tuple: (server requests at page load, server requests of each interaction, server seconds, clientside calls)
+    """
+    nhl_app = NHLApp(FILES, preload='eager', ui_callbacks=ui_callbacks, coalesce_seconds=0)
+    dash_app = nhl_app.app
+    client = dash_app.server.test_client()
+    callbacks = dash_app._callback_list
+    values = layout_values(nhl_app)
+    server_seconds = 0.0
+    clientside = 0
+
+    def fire(changed):
+        """
+        Fires the callbacks with a changed input until no new output triggers another, returns the server requests
+        """
+        nonlocal server_seconds, clientside
+        requests = 0
+        pending = [callback for callback in callbacks
+                   if changed is None or any(f"{dep['id']}.{dep['property']}" in changed
+                                             for dep in callback['inputs'])]
+        while pending:
+            outputs = set()
+            for callback in pending:
+                if callback.get('clientside_function'):
+                    clientside += 1
+                    continue
+                payload = callback_payload(dash_app, callback['output'], values)
+                start = time.perf_counter()
+                response = client.post('/_dash-update-component', json=payload)
+                server_seconds += time.perf_counter() - start
+                requests += 1
+                if response.status_code == 200:
+                    for component, props in response.get_json()['response'].items():
+                        for name, value in props.items():
+                            values[f'{component}.{name}'] = value
+                            outputs.add(f'{component}.{name}')
+            pending = [callback for callback in callbacks
+                       if any(f"{dep['id']}.{dep['property']}" in outputs for dep in callback['inputs'])]
+        return requests
+
+    page_load = fire(None)
+    interactions = []
+    for name, change in SESSION:
+        values.update(change)
+        interactions.append((name, fire(set(change))))
+    return page_load, interactions, server_seconds, clientside
+
+
+def main():
+    results = {mode: replay(mode) for mode in ('server', 'clientside')}
+    print(f"{'':<16}{'server UI callbacks':>22}{'clientside UI callbacks':>26}")
+    print(f"{'page load':<16}{results['server'][0]:>22}{results['clientside'][0]:>26}")
+    for i, (name, _) in enumerate(SESSION):
+        print(f"{name:<16}{results['server'][1][i][1]:>22}{results['clientside'][1][i][1]:>26}")
+    for mode, (page_load, interactions, seconds, clientside) in results.items():
+        total = page_load + sum(requests for _, requests in interactions)
+        print(f'{mode} UI callbacks: {total} server requests per session, {seconds * 1000:.1f} ms of server time, '
+              f'{clientside} clientside calls')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Per-call latency of fantasy scoring, before and after the matrix scoring engine
+
+    python benchmarks/bench_scoring.py
+
+Also checks every fantasy column of the engine matches the original 12 column implementation exactly, for the
+default scoring and a set of random scoring vectors on every season. Exits with status 1 when any value differs.
+"""
+import sys
+
+import numpy as np
+
+from bench_utils import FILES, report, timed
+from model import FantasyModel
+from season_index import rank_order, top_n
+
+
+def legacy_calc_fantasy_stats(df, scoring):
+    """
+    The original column by column scoring, kept as the reference implementation
+    """
+    scoring = {label: float(value) for label, value in scoring.items()}
+    df['f_goals'] = df['goals'] * scoring['f_goal']
+    df['f_ppgs'] = df['pp_goals'] * scoring['f_ppg']
+    df['f_shgs'] = df['pk_goals'] * scoring['f_shg']
+    df['f_sogs'] = df['shots_on_goal'] * scoring['f_sog']
+    df['f_assists'] = df['assists'] * scoring['f_assist']
+    df['f_ppas'] = df['pp_assists'] * scoring['f_ppa']
+    df['f_shas'] = df['pk_assists'] * scoring['f_sha']
+    df['f_faceoff_wins'] = df['faceoffswon'] * scoring['f_faceoff_win']
+    df['f_takeaways'] = df['takeaways'] * scoring['f_takeaway']
+    df['f_giveaways'] = df['giveaways'] * scoring['f_giveaway']
+    df['f_hits'] = df['hits'] * scoring['f_hit']
+    df['f_blocks'] = df['blocked_shots'] * scoring['f_block']
+    df['f_points'] = df[['f_goals', 'f_ppgs', 'f_shgs', 'f_sogs', 'f_assists', 'f_ppas', 'f_shas',
+                         'f_faceoff_wins', 'f_takeaways', 'f_giveaways', 'f_hits', 'f_blocks']].sum(axis=1)
+    return df
+
+
+def check_identical(model, trials=25, seed=0):
+    """
+    Compares the engine against the legacy implementation
+
+    Returns:
+    int: Number of mismatching values across all seasons and scoring vectors
+    """
+    rng = np.random.default_rng(seed)
+    scorings = [dict(model.f_scoring)]
+    scorings += [dict(zip(model.f_labels, rng.normal(size=len(model.f_labels)).round(2))) for _ in range(trials)]
+    mismatches = 0
+    for df in model.dfs:
+        matrix = model.engine.stat_matrix(df)
+        for scoring in scorings:
+            expected = legacy_calc_fantasy_stats(df.copy(), scoring)[model.f_categories].to_numpy()
+            mismatches += int((model.engine.score(matrix, scoring) != expected).sum())
+    return mismatches
+
+
+def main(repeat=7, number=50):
+    model = FantasyModel(FILES)
+    scoring = dict(model.f_scoring)
+    df = model.get_df('2024')
+    matrix = model.engine.season_matrix('2024', df)
+
+    mismatches = check_identical(model)
+    print(f'engine vs legacy mismatching values: {mismatches}')
+
+    report('legacy calc_fantasy_stats', timed(lambda: legacy_calc_fantasy_stats(df.copy(), scoring), repeat, number))
+    report('calc_fantasy_stats', timed(lambda: model.calc_fantasy_stats(df.copy(), scoring), repeat, number))
+    report('score_season (scored cache hit)', timed(lambda: model.score_season('2024', scoring), repeat, number))
+    report('engine.score (cached matrix)', timed(lambda: model.engine.score(matrix, scoring), repeat, number))
+
+    values = model.engine.score(matrix, scoring)
+    totals = values[:, -1]
+    rows = np.arange(len(totals))
+    for n in [10, 100, 500]:
+        report(f'full sort top {n}', timed(lambda: rows[rank_order(totals)[:n]], repeat, number))
+        report(f'top_n top {n}', timed(lambda: top_n(totals, rows, n), repeat, number))
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Player similarity search latency over every bundled season combined
+
+    python benchmarks/bench_similarity.py
+
+For each rate (per game, per 60): the time to build the SimilarityIndex, the latency of a single player query
+with and without team/position/season filters, and batched queries of many players at once (per query cost).
+Every query's neighbours are checked against a brute force search computing each distance separately.
+"""
+import numpy as np
+
+from bench_utils import FILES, report, timed
+from model import NHLModel
+from similarity import SimilarityIndex
+
+FILTERS = {
+    'no filter': {},
+    'defence': {'positions': ['D']},
+    'two teams forwards': {'teams': ['TOR', 'BOS'], 'positions': ['C', 'L', 'R']},
+    '2024 season, 20+ games': {'years': [2024], 'min_games': 20},
+}
+BATCHES = [1, 10, 100, 1000]
+
+
+def brute_force(index, row, k, **filters):
+    """
+    Finds the k nearest rows of a row one distance at a time, the reference implementation
+
+    Returns:
+    tuple: (rows, distances) nearest first
+    """
+    candidates = [c for c in index.candidates(**filters) if index.playerids[c] != index.playerids[row]]
+    distances = np.array([np.sqrt(np.sum((index.vectors[c] - index.vectors[row]) ** 2)) for c in candidates])
+    order = np.argsort(distances, kind='stable')[:k]
+    return np.array(candidates)[order], distances[order]
+
+
+def check(index, rows, k=10):
+    """
+    Compares batched queries against the brute force search
+
+    Returns:
+    int: Number of queries whose neighbours or distances differ
+    """
+    mismatches = 0
+    for filters in FILTERS.values():
+        for row, (found, distances) in zip(rows, index.query(rows, k, **filters)):
+            expected, expected_distances = brute_force(index, row, k, **filters)
+            if not np.array_equal(found, expected) or not np.allclose(distances, expected_distances):
+                mismatches += 1
+    return mismatches
+
+
+def main(repeat=7):
+    model = NHLModel(FILES)
+    model.store.multi_season()
+    rng = np.random.default_rng(0)
+
+    for rate in SimilarityIndex.rates:
+        report(f'{rate}: build index', timed(lambda: SimilarityIndex(model.store.multi_season(),
+                                                                      [o['value'] for o in model.all_options],
+                                                                      rate), repeat))
+        index = model.get_similarity_index(rate)
+        print(f'{rate}: {len(index)} player seasons x {len(index.stats)} stats')
+
+        row = index.player_row(int(model.get_df('2024')['playerid'].iloc[0]))
+        for name, filters in FILTERS.items():
+            report(f'{rate}: 1 query, {name}', timed(lambda: index.query([row], 10, **filters), repeat, 20))
+
+        for batch in BATCHES:
+            rows = rng.choice(len(index), size=min(batch, len(index)), replace=False)
+            samples = timed(lambda: index.query(rows, 10), repeat)
+            report(f'{rate}: batch of {batch}, per query', [sample / len(rows) for sample in samples])
+
+        print(f'{rate}: {check(index, rng.choice(len(index), size=50, replace=False))} queries differ from '
+              f'brute force (of {50 * len(FILTERS)})')
+
+
+if __name__ == '__main__':
+    main()
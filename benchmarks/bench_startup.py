@@ -0,0 +1,35 @@
+"""
+Cold vs. warm startup of the season store, loading every season
+
+    python benchmarks/bench_startup.py
+
+cold:     Snapshot cache directory is empty, every CSV is parsed, compacted and written as a snapshot
+warm:     Every snapshot is valid and memory-mapped, no CSV is parsed
+no cache: Every CSV is parsed and compacted, nothing is written
+"""
+import shutil
+import tempfile
+
+from bench_utils import FILES, report, timed
+from season_store import SeasonStore, SnapshotCache
+
+
+def main(repeat=5):
+    cache_dir = tempfile.mkdtemp(prefix='season_cache_')
+    try:
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            SeasonStore(FILES, SnapshotCache(cache_dir)).frames
+
+        def warm():
+            SeasonStore(FILES, SnapshotCache(cache_dir)).frames
+
+        report('startup: no cache', timed(lambda: SeasonStore(FILES).frames, repeat))
+        report('startup: cold snapshot cache', timed(cold, repeat))
+        report('startup: warm snapshot cache', timed(warm, repeat))
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
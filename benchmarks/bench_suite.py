@@ -0,0 +1,195 @@
+"""
+Benchmark suite of the model and controller hot paths, emitting JSON so runs can be compared over time
+
+    python benchmarks/bench_suite.py [--scales 1 10 100] [--repeat 5] [--number 3] [--output results.json]
+
+Drives the paths directly, without a browser or the figure cache:
+    calc_fantasy_stats   FantasyModel.calc_fantasy_stats on a copy of each season
+    score_season         FantasyModel.score_season with an empty scored cache
+    top_rows             Team/position filtering + top-N ranking (NHLController.top_rows)
+    build_figure         The whole graph callback minus Dash (NHLController.build_figure)
+
+over a matrix of seasons, team/position filters, stats, slider sizes (10-500), real vs. fantasy data and bar vs.
+scatter graphs. Scale 1 runs every bundled season, scales above 1 run a synthetic copy of the newest season with
+scale times the players (each player repeated with randomly scaled stats, fixed seed).
+
+The JSON holds the run's environment (versions, platform, git commit, seed) and one result per
+(dataset, season, path, case) with the median/min/max milliseconds per call. The controller's stage histograms
+collected during the run are included under 'stage_timings'.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import plotly
+
+from bench_utils import FILES, ROOT, summarize, timed
+from nhl_app import NHLApp
+from scoring import ScoredSeason
+
+SLIDERS = [10, 50, 100, 500]
+FILTERS = {
+    'all': (None, None),
+    'defence': (None, ['D']),
+    'two teams forwards': (['TOR', 'BOS'], ['C', 'L', 'R']),
+}
+
+#(data, graph, stat, stat2)
+CASES = [
+    ('real', 'bar', 'points', None),
+    ('real', 'bar', 'hits', None),
+    ('real', 'scatter', 'points', 'shots_on_goal'),
+    ('fantasy', 'bar', ['f_points'], None),
+    ('fantasy', 'bar', ['f_goals', 'f_assists', 'f_hits'], None),
+    ('fantasy', 'scatter', 'f_points', 'f_sogs'),
+]
+
+
+def synthetic_files(scale, directory, seed=0):
+    """
+    Writes a synthetic season with scale times the players of the newest bundled season
+
+    Each player is repeated scale times with a new playerid and name, every integer stat multiplied by a random
+    factor between 0.5 and 1.5 (the first copy keeps the real stats).
+
+    Parameters:
+    scale (int): Number of copies of each player
+    directory (str): Directory the season file is written to
+    seed (int): Seed of the random factors
+
+    Returns:
+    list: The season file name without the '.csv' extension
+    """
+    rng = np.random.default_rng(seed)
+    season = pd.read_csv(f'{FILES[0]}.csv')
+    stats = [column for column in season.select_dtypes(include='integer').columns
+             if column not in ('playerid', 'season')]
+
+    copies = []
+    for copy in range(scale):
+        df = season.copy()
+        if copy:
+            factors = rng.uniform(0.5, 1.5, size=(len(df), len(stats)))
+            df[stats] = np.rint(df[stats].to_numpy() * factors).astype(np.int64)
+            df['playerid'] = df['playerid'] * 1000 + copy
+            df['name'] = df['name'] + f' {copy}'
+        copies.append(df)
+
+    file = os.path.join(directory, os.path.basename(FILES[0]))
+    pd.concat(copies, ignore_index=True).to_csv(f'{file}.csv', index=False)
+    return [file]
+
+
+def environment(args):
+    """
+    Gets the versions, platform and git commit the suite ran with
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'plotly': plotly.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'number': args.number,
+    }
+
+
+def run_dataset(name, files, args, results):
+    """
+    Runs every path of the matrix on a dataset, appending a result dict per measurement
+
+    Returns:
+    NHLApp: The app the dataset ran on
+    """
+    nhl_app = NHLApp(files, cache_dir=None, preload='eager')
+    controller = nhl_app.controller
+    controller.figure_cache = None
+    fantasy_model = nhl_app.fantasy_model
+    scoring = fantasy_model.f_scoring
+
+    def measure(season, path, func, players, **case):
+        summary = summarize(timed(func, args.repeat, args.number))
+        results.append(dict(dataset=name, season=season, path=path, players=players, **case, **summary))
+
+    for season in nhl_app.store.seasons():
+        df = nhl_app.store.get(season)
+        players = len(df)
+        copy = df.copy()
+        measure(season, 'calc_fantasy_stats', lambda: fantasy_model.calc_fantasy_stats(copy, scoring), players)
+
+        def score_cold():
+            fantasy_model.scored_cache.clear()
+            fantasy_model.score_season(season, scoring)
+        measure(season, 'score_season', score_cold, players)
+
+        for data, graph, stat, stat2 in CASES:
+            real = data == 'real'
+            for filter_name, (teams, positions) in FILTERS.items():
+                for slider in SLIDERS:
+                    #Bar graphs only go up to 100 players
+                    if graph == 'bar' and slider > 100:
+                        continue
+                    case = dict(data=data, graph=graph, stat=stat, stat2=stat2, filter=filter_name, slider=slider)
+
+                    #The fantasy bar graph ranks the sum of its stats inside build_figure instead
+                    if graph == 'scatter' or real:
+                        shown = ScoredSeason(df) if real else fantasy_model.score_season(season, scoring)
+                        measure(season, 'top_rows',
+                                lambda: controller.top_rows(shown, season, stat, teams, positions, slider),
+                                players, **case)
+
+                    measure(season, 'build_figure',
+                            lambda: controller.build_figure(real, season, graph, teams, positions, stat, stat2,
+                                                            slider, scoring),
+                            players, **case)
+    return nhl_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite of the model and controller hot paths')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help='Dataset scales, 1 is the bundled seasons, N > 1 a synthetic season of N x players')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing samples per measurement')
+    parser.add_argument('--number', type=int, default=3, help='Calls per timing sample')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic datasets')
+    parser.add_argument('--output', help='JSON file to write, printed to stdout when omitted')
+    args = parser.parse_args()
+
+    results = []
+    stage_timings = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scales:
+            name = 'bundled' if scale == 1 else f'synthetic_{scale}x'
+            files = FILES if scale == 1 else synthetic_files(scale, directory, args.seed)
+            print(f'Running {name}...', file=sys.stderr)
+            nhl_app = run_dataset(name, files, args, results)
+            stage_timings[name] = nhl_app.timings.summary()
+
+    report = {'environment': environment(args), 'results': results, 'stage_timings': stage_timings}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f'{len(results)} results written to {args.output}', file=sys.stderr)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+
+
+if __name__ == '__main__':
+    main()
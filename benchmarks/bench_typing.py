@@ -0,0 +1,87 @@
+"""
+Typing load on the fantasy scoring inputs: figure builds per settled change, with and without coalescing
+
+    python benchmarks/bench_typing.py [sessions] [keystroke gap ms]
+
+Each session types a new value into a scoring box one character at a time, every keystroke posting the scoring
+change to update_graph from its own thread as an undebounced input would. Counts the figures built and the
+requests dropped as superseded, and checks every session's last response shows its final scoring. The figure
+cache is disabled so every request that isn't dropped builds its figure.
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import FILES, callback_payload
+from coalesce import RequestCoalescer
+from nhl_app import NHLApp
+
+GRAPH = '..output_graph.figure...figure_state.data..'
+
+#Values of the f_goal box after each keystroke of '2.75'
+KEYSTROKES = [2.0, 2.0, 2.7, 2.75]
+
+
+def run(nhl_app, coalescer, sessions, gap):
+    """
+    Types KEYSTROKES in every session at the same time
+
+    Returns:
+    tuple: (figures built, requests dropped, sessions whose last response isn't their final scoring, seconds)
+    """
+    controller = nhl_app.controller
+    controller.coalescer = coalescer
+    dash_app = nhl_app.app
+    builds = []
+    build_figure = controller.build_figure
+
+    def counted(*args):
+        builds.append(1)
+        return build_figure(*args)
+    controller.build_figure = counted
+
+    def post(session, value):
+        scoring = dict(nhl_app.fantasy_model.f_scoring, f_goal=value + session / 100)
+        values = {
+            'select_data.value': False, 'select_year.value': '2024', 'select_graph.value': 'bar',
+            'select_stat.value': ['f_points'], 'slider_value.value': 50, 'scoring_store.data': scoring,
+            'select_seasons.value': [2020, 2024], 'select_season_mode.value': 'total',
+        }
+        payload = callback_payload(dash_app, GRAPH, values, changed=['scoring_store.data'])
+        payload['state'][1]['value'] = f'session-{session}'
+        response = dash_app.server.test_client().post('/_dash-update-component', json=payload)
+        return response.status_code, response.get_data()
+
+    def type_value(session, pool):
+        futures = []
+        for value in KEYSTROKES:
+            futures.append(pool.submit(post, session, value))
+            time.sleep(gap)
+        return [future.result() for future in futures]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions * len(KEYSTROKES)) as pool, \
+            ThreadPoolExecutor(max_workers=sessions) as typists:
+        results = list(typists.map(lambda session: type_value(session, pool), range(sessions)))
+    elapsed = time.perf_counter() - start
+    controller.build_figure = build_figure
+
+    #Every session's last request must answer with the figure of its final scoring
+    dropped = sum(status == 204 for responses in results for status, _ in responses)
+    wrong = sum(responses[-1] != (200, post(session, KEYSTROKES[-1])[1]) for session, responses in enumerate(results))
+    return len(builds), dropped, wrong, elapsed
+
+
+def main(sessions=4, gap_ms=40):
+    nhl_app = NHLApp(FILES, preload='eager')
+    nhl_app.controller.figure_cache = None
+    keystrokes = sessions * len(KEYSTROKES)
+
+    for name, coalescer in [('every keystroke', None), ('coalesced 0.15 s', RequestCoalescer(0.15))]:
+        builds, dropped, wrong, elapsed = run(nhl_app, coalescer, sessions, gap_ms / 1000)
+        print(f'{name:<20} {keystrokes} keystrokes in {sessions} sessions: {builds} figures built, '
+              f'{dropped} requests dropped, {wrong} sessions not showing their final scoring, {elapsed:.2f} s')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,96 @@
+import os
+import statistics
+import sys
+import time
+
+#Benchmarks are run as scripts from the repo root (python benchmarks/bench_x.py), make the app modules importable
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+#Season files bundled with the repo, newest first as in nhl_app.py
+FILES = [os.path.join(ROOT, name) for name in ['skaters_24', 'skaters_23', 'skaters_22', 'skaters_21', 'skaters_20']]
+
+
+def timed(func, repeat=5, number=1):
+    """
+    Times a function call
+
+    Parameters:
+    func (callable): Called with no arguments
+    repeat (int): Number of samples taken
+    number (int): Number of calls per sample
+
+    Returns:
+    list: Seconds per call of each sample
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def summarize(samples):
+    """
+    Summarizes timing samples
+
+    Parameters:
+    samples (list): Seconds per call of each sample
+
+    Returns:
+    dict: Median, min and max in milliseconds
+    """
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 4),
+        'min_ms': round(min(samples) * 1000, 4),
+        'max_ms': round(max(samples) * 1000, 4),
+    }
+
+
+def report(name, samples):
+    """
+    Prints one line summarizing the timing samples of a benchmark
+
+    Parameters:
+    name (str): Name of the benchmark
+    samples (list): Seconds per call of each sample
+
+    Returns:
+        None
+    """
+    summary = summarize(samples)
+    print(f"{name:<40} median {summary['median_ms']:>10.3f} ms   "
+          f"min {summary['min_ms']:>10.3f} ms   max {summary['max_ms']:>10.3f} ms")
+
+
+def callback_payload(app, output, values, changed=None):
+    """
+    Builds the JSON body the browser posts to /_dash-update-component for a callback
+
+    Parameters:
+    app (dash.Dash): The Dash app the callback is registered on
+    output (str): The callback's output key as in app.callback_map (ie. 'scoring_store.data')
+    values (dict): 'component_id.property' -> value of each Input/State, missing ones are sent as None
+    changed (list or None): 'component_id.property' of the triggering inputs, None marks every input changed
+
+    Returns:
+    dict: The request body
+    """
+    callback = app.callback_map[output]
+
+    def props(dependencies):
+        return [{'id': dep['id'], 'property': dep['property'], 'value': values.get(f"{dep['id']}.{dep['property']}")}
+                for dep in dependencies]
+
+    outputs = [dict(zip(('id', 'property'), key.rsplit('.', 1))) for key in output.strip('.').split('...')]
+    inputs = props(callback['inputs'])
+    return {
+        'output': output,
+        'outputs': outputs if len(outputs) > 1 else outputs[0],
+        'inputs': inputs,
+        'state': props(callback.get('state', [])),
+        'changedPropIds': changed if changed is not None else [f"{dep['id']}.{dep['property']}" for dep in inputs],
+    }
@@ -0,0 +1,69 @@
+"""
+Load test of concurrent sessions with different fantasy scoring
+
+    python benchmarks/load_sessions.py [sessions] [requests per session]
+
+Each session runs on its own thread with its own Flask test client, posting the same callback requests the
+browser would: its fantasy inputs go through update_scoring_store, the resulting scoring goes to update_graph.
+Every figure returned must match the figure built for that session's scoring alone. Exits non-zero on any
+mismatch.
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bench_utils import FILES, callback_payload
+from nhl_app import NHLApp
+
+GRAPH = '..output_graph.figure...figure_state.data..'
+SCORING = 'scoring_store.data'
+
+
+def graph_values(response):
+    """
+    Gets the plotted y values of an update_graph response, sent as a full figure since no figure_state is posted
+    """
+    figure = response.get_json()['response']['output_graph']['figure']
+    return [str(trace['y']) for trace in figure['data']]
+
+
+def main(sessions=8, requests=5, seed=0):
+    app = NHLApp(FILES, cache_dir=None)
+    dash_app = app.app
+    labels = app.fantasy_model.f_labels
+    rng = np.random.default_rng(seed)
+    inputs = [rng.normal(size=len(labels)).round(2).tolist() for _ in range(sessions)]
+    selection = {
+        'select_data.value': False, 'select_year.value': '2024', 'select_graph.value': 'bar',
+        'select_stat.value': ['f_points'], 'select_stat2.value': 'f_points', 'slider_value.value': 50,
+    }
+
+    def session(i, client):
+        f_values = {f'{label}.value': value for label, value in zip(labels, inputs[i])}
+        scoring = client.post('/_dash-update-component',
+                              json=callback_payload(dash_app, SCORING, f_values)).get_json()
+        values = dict(selection, **{SCORING: scoring['response']['scoring_store']['data']})
+        return graph_values(client.post('/_dash-update-component', json=callback_payload(dash_app, GRAPH, values)))
+
+    #Reference figure of each session, built one at a time
+    expected = [session(i, dash_app.server.test_client()) for i in range(sessions)]
+
+    def worker(i):
+        client = dash_app.server.test_client()
+        return sum(session(i, client) != expected[i] for _ in range(requests))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        failures = sum(pool.map(worker, range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    total = sessions * requests * 2
+    print(f'{sessions} concurrent sessions x {requests} interactions: {failures} figures showed another '
+          f"session's scoring, {total} requests in {elapsed:.2f} s ({total / elapsed:.1f} req/s)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(*(int(arg) for arg in sys.argv[1:])))
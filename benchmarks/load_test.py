@@ -0,0 +1,130 @@
+"""
+HTTP load test of a running server with the typical graph callbacks
+
+    gunicorn -c gunicorn.conf.py wsgi:server &
+    python benchmarks/load_test.py [url] [concurrency] [requests]
+
+Posts update_graph requests to /_dash-update-component from concurrent clients, over real HTTP, against the
+server at url (default http://127.0.0.1:8050). Requests are a random mix of real stat bar/scatter graphs, season
+ranges and fantasy graphs with random scoring values (which miss every cache). Reports requests/sec and the
+latency percentiles of each callback type.
+"""
+import json
+import random
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+GRAPH = '..output_graph.figure...figure_state.data..'
+
+DEFAULT_SCORING = {'f_goal': 2, 'f_ppg': 1, 'f_shg': 2, 'f_sog': 0.3, 'f_assist': 1, 'f_ppa': 0.5, 'f_sha': 1,
+                   'f_faceoff_win': 0.1, 'f_takeaway': 0.2, 'f_giveaway': -0.3, 'f_hit': 0.1, 'f_block': 0.3}
+KINDS = ['real bar', 'real scatter', 'season range', 'fantasy bar', 'fantasy scatter']
+TEAMS = ['TOR', 'BOS', 'MTL', 'EDM', 'COL', 'NYR', 'TBL', 'VAN']
+
+
+def selections(kind, rng):
+    """
+    Builds the update_graph input values of a callback type
+
+    Parameters:
+    kind (str): The callback type, one of KINDS
+    rng (random.Random): Source of the random selections
+
+    Returns:
+    dict: 'component_id.property' -> value
+    """
+    values = {
+        'select_data.value': True, 'select_year.value': rng.choice(['2024', '2023', '2022', '2021', '2020']),
+        'select_graph.value': 'bar', 'select_teams.value': None, 'select_position.value': None,
+        'select_stat.value': 'points', 'select_stat2.value': 'goals', 'slider_value.value': rng.choice([20, 50, 100]),
+        'scoring_store.data': DEFAULT_SCORING, 'select_seasons.value': [2020, 2024],
+        'select_season_mode.value': 'total',
+    }
+    if kind == 'real bar':
+        values['select_teams.value'] = rng.sample(TEAMS, rng.randint(0, 2)) or None
+        values['select_stat.value'] = rng.choice(['points', 'goals', 'assists', 'hits'])
+    elif kind == 'real scatter':
+        values.update({'select_graph.value': 'scatter', 'slider_value.value': rng.choice([200, 500]),
+                       'select_stat2.value': rng.choice(['shots_on_goal', 'hits', 'blocked_shots'])})
+    elif kind == 'season range':
+        values.update({'select_year.value': 'range', 'select_seasons.value': sorted(rng.sample(range(2020, 2025), 2)),
+                       'select_season_mode.value': rng.choice(['total', 'per_game', 'rolling_2'])})
+    elif kind == 'fantasy bar':
+        scoring = dict(DEFAULT_SCORING, **{label: round(rng.uniform(-1, 3), 2)
+                                           for label in rng.sample(list(DEFAULT_SCORING), 2)})
+        values.update({'select_data.value': False, 'select_stat.value': ['f_points'], 'scoring_store.data': scoring})
+    elif kind == 'fantasy scatter':
+        values.update({'select_data.value': False, 'select_graph.value': 'scatter', 'select_stat.value': 'f_points',
+                       'select_stat2.value': 'f_goals', 'slider_value.value': 500})
+    return values
+
+
+def payload(dependency, values):
+    """
+    Builds the JSON body the browser posts for a callback, from its entry in /_dash-dependencies
+    """
+    def props(dependencies):
+        return [{'id': dep['id'], 'property': dep['property'], 'value': values.get(f"{dep['id']}.{dep['property']}")}
+                for dep in dependencies]
+
+    inputs = props(dependency['inputs'])
+    return {
+        'output': dependency['output'],
+        'outputs': [dict(zip(('id', 'property'), key.rsplit('.', 1)))
+                    for key in dependency['output'].strip('.').split('...')],
+        'inputs': inputs,
+        'state': props(dependency['state']),
+        'changedPropIds': [f"{dep['id']}.{dep['property']}" for dep in inputs],
+    }
+
+
+def percentile(samples, q):
+    """
+    Gets the q-th percentile (0-100) of the samples
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def main(url='http://127.0.0.1:8050', concurrency=16, requests=400, seed=0):
+    with urllib.request.urlopen(f'{url}/_dash-dependencies') as response:
+        dependency = next(dep for dep in json.load(response) if dep['output'] == GRAPH)
+
+    rng = random.Random(seed)
+    jobs = [(kind, json.dumps(payload(dependency, selections(kind, rng))).encode())
+            for kind in (rng.choice(KINDS) for _ in range(requests))]
+
+    def post(job):
+        kind, body = job
+        request = urllib.request.Request(f'{url}/_dash-update-component', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                ok = response.status in (200, 204)
+        except OSError:
+            ok = False
+        return kind, time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(post, jobs))
+    elapsed = time.perf_counter() - start
+
+    errors = sum(not ok for _, _, ok in results)
+    print(f'{requests} requests, concurrency {concurrency}: {requests / elapsed:.1f} req/s, {errors} errors')
+    for kind in KINDS + ['all']:
+        latencies = [seconds * 1000 for k, seconds, _ in results if kind in (k, 'all')]
+        if latencies:
+            print(f'{kind:<16} n={len(latencies):<5} p50 {statistics.median(latencies):>8.1f} ms   '
+                  f'p95 {percentile(latencies, 95):>8.1f} ms   p99 {percentile(latencies, 99):>8.1f} ms')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    sys.exit(main(*args[:1], *(int(arg) for arg in args[1:])))
@@ -0,0 +1,63 @@
+"""
+Concurrency stress test of fantasy scoring
+
+    python benchmarks/stress_scoring.py
+
+Many threads build fantasy figures for the same season at once, each with its own scoring values. Every figure
+must match the one built for that scoring on a single thread, and the shared season frames must never gain
+fantasy columns. Exits non-zero on any mismatch.
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bench_utils import FILES
+from nhl_app import NHLApp
+
+
+def figure_values(fig):
+    """
+    Gets the plotted values of a figure, used to compare figures built on different threads
+    """
+    return [(list(trace.x), list(np.asarray(trace.y, dtype=float))) for trace in fig.data]
+
+
+def main(threads=8, iterations=5, seed=0):
+    app = NHLApp(FILES, cache_dir=None)
+    controller = app.controller
+    labels = app.fantasy_model.f_labels
+    rng = np.random.default_rng(seed)
+    scorings = [dict(zip(labels, rng.normal(size=len(labels)).round(2))) for _ in range(threads)]
+    selections = [
+        (False, '2024', 'bar', None, None, ['f_points'], 'f_points', 50),
+        (False, '2024', 'bar', ['TOR', 'BOS'], ['C', 'D'], ['f_goals', 'f_hits'], 'f_points', 20),
+        (False, '2024', 'scatter', None, None, 'f_points', 'f_sogs', 200),
+    ]
+
+    def build(selection, scoring):
+        return figure_values(controller.build_figure(*selection, scoring))
+
+    expected = {(i, j): build(selection, scoring)
+                for i, scoring in enumerate(scorings) for j, selection in enumerate(selections)}
+
+    def worker(i):
+        failures = 0
+        for _ in range(iterations):
+            for j, selection in enumerate(selections):
+                failures += build(selection, scorings[i]) != expected[(i, j)]
+        return failures
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        failures = sum(pool.map(worker, range(threads)))
+
+    leaked = [file for file, df in zip(app.store.files, app.store.frames)
+              if any(column in df.columns for column in app.fantasy_model.f_categories)]
+
+    print(f'{threads} threads x {iterations} iterations x {len(selections)} graphs: '
+          f'{failures} mismatching figures, fantasy columns leaked into {len(leaked)} season frames')
+    return 1 if failures or leaked else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
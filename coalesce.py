@@ -0,0 +1,81 @@
+import threading
+
+
+class RequestCoalescer:
+    """
+    Coalesces rapid requests from the same session so only the latest one does the work
+
+    Each request registers under its session and waits a short settle window. When a newer request of the same
+    session arrives in the meantime, it wakes the older one, which returns at once and should be dropped: the
+    browser only shows the response of its latest request anyway.
+
+    The latest request of a session always waits out the whole window, so coalescing adds up to window seconds to
+    every scoring change it lets through, on top of the scoring inputs' debounce.
+
+    Sessions are tracked in this process only. Under several worker processes a session's consecutive requests
+    usually land on different workers, which never see each other's requests: nothing is coalesced and every
+    request still waits the full window. Only use it with a single worker or sticky sessions (see wsgi.py).
+
+    Attributes:
+        window (float): Seconds a request waits for a newer one before doing its work
+        settled (int): Requests which did their work
+        coalesced (int): Requests dropped because a newer one arrived within the window
+    """
+    def __init__(self, window=0.15):
+        """
+        Initialize the RequestCoalescer
+
+        Parameters:
+        window (float): Seconds a request waits for a newer one before doing its work. The default 0.15 adds at
+                        most 0.15 seconds to each scoring change that is built
+        """
+        self.window = window
+        self.waiting = {}
+        self.lock = threading.Lock()
+        self.settled = 0
+        self.coalesced = 0
+
+    def settle(self, session):
+        """
+        Registers a request of a session and waits out the settle window, or until a newer request supersedes it
+
+        Parameters:
+        session (str): Id of the session the request came from
+
+        Returns:
+        bool: True when the request is still the session's latest and should do its work, False when superseded
+        """
+        superseded = threading.Event()
+        with self.lock:
+            #Wake the session's waiting request, it returns as superseded without waiting out its window
+            older = self.waiting.get(session)
+            if older is not None:
+                older.set()
+            self.waiting[session] = superseded
+
+        superseded.wait(self.window)
+
+        with self.lock:
+            if superseded.is_set():
+                self.coalesced += 1
+                return False
+
+            #Nothing newer is waiting, forget the session until its next request
+            del self.waiting[session]
+            self.settled += 1
+            return True
+
+    def stats(self):
+        """
+        Gets the coalescing counters
+
+        Returns:
+        dict: settled, coalesced, the window in seconds and the sessions with a request waiting
+        """
+        with self.lock:
+            return {
+                'settled': self.settled,
+                'coalesced': self.coalesced,
+                'window_seconds': self.window,
+                'waiting_sessions': len(self.waiting),
+            }
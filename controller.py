@@ -1,10 +1,26 @@
-import plotly.express as px
-from dash import dcc
-from dash.dependencies import Input, Output
+import json
+import logging
+
+import numpy as np
+from dash import Patch, ctx, no_update
+from dash.exceptions import PreventUpdate
+from dash.dependencies import ClientsideFunction, Input, Output, State
+
+from figure_builders import FIGURE_MODES
+from scoring import ScoredSeason
+from season_index import rank_order, top_n
+from timings import Timings
+
+logger = logging.getLogger(__name__)
 
 
 class NHLController:
-    def __init__(self, app, nhl_model, fantasy_model, view):
+
+    #Name of the session's own scoring in the league presets graph
+    session_preset = 'Your Scoring'
+
+    def __init__(self, app, nhl_model, fantasy_model, view, figure_cache=None, figure_mode='graph_objects',
+                 coalescer=None, ui_callbacks='clientside', timings=None):
         """
         Initialize NHLController class
 
@@ -13,14 +29,414 @@ class NHLController:
         :param nhl_model: NHLModel instance, contains data, getters, setters for the real stats display
         :param fantasy_model: FantasyModel instance which contains data, getters, setters for the fantasy display
         :param view: NHLView instance which contains the UI
+        :param figure_cache: FigureCache instance serving figures already built for the same selections,
+                             None builds every figure
+        :param figure_mode: How figures are built, 'graph_objects' directly from the selected rows' arrays,
+                            'webgl' the same with WebGL scatter plots, 'express' through plotly.express
+        :param coalescer: RequestCoalescer dropping a session's scoring changes superseded by a newer one,
+                          None builds every change
+        :param ui_callbacks: 'clientside' to reconfigure the slider and dropdowns in the browser,
+                             'server' to do it with server callbacks
+        :param timings: Timings recording the latency of each callback stage, None for a new one
 
         """
         self.app = app
         self.nhl_model = nhl_model
         self.fantasy_model = fantasy_model
         self.view = view
+        self.figure_cache = figure_cache
+        self.figure_mode = figure_mode
+        self.figures = FIGURE_MODES[figure_mode]()
+        self.coalescer = coalescer
+        self.ui_callbacks = ui_callbacks
+        self.timings = timings if timings is not None else Timings()
         self.register_callbacks()
 
+    def filter_rows(self, year_selected, team_selected, position_selected):
+        """
+        Gets the rows of a season matching the team and position filters from the season's pre-built masks
+
+        Parameters:
+        year_selected (str): The statistical year being displayed
+        team_selected (list or None): Selected team(s), None or empty for all teams
+        position_selected (list or None): Selected position(s), None or empty for all positions
+
+        Returns:
+        np.ndarray: Row positions of the matching players
+        """
+        with self.timings.stage('filter'):
+            return self.nhl_model.get_index(year_selected).rows(team_selected, position_selected)
+
+    def top_rows(self, season, year_selected, stat, team_selected, position_selected, slider_val):
+        """
+        Gets the top rows of a stat matching the team and position filters, ties keep their season order
+
+        Real stats are a slice of the season's pre-built rank order, derived (fantasy) stats are ranked on request
+
+        Parameters:
+        season (ScoredSeason): The season being displayed
+        year_selected (str): The statistical year being displayed
+        stat (str): The stat to rank by
+        team_selected (list or None): Selected team(s), None or empty for all teams
+        position_selected (list or None): Selected position(s), None or empty for all positions
+        slider_val (int): Number of rows to keep
+
+        Returns:
+        np.ndarray: Row positions of the top slider_val rows, highest value first
+        """
+        index = self.nhl_model.get_index(year_selected)
+        if stat in index.orders and stat not in season.positions:
+            with self.timings.stage('filter'):
+                mask = index.mask(team_selected, position_selected)
+            with self.timings.stage('rank'):
+                return index.top_masked(stat, slider_val, mask)
+
+        rows = self.filter_rows(year_selected, team_selected, position_selected)
+        with self.timings.stage('rank'):
+            return top_n(season.column(stat)[rows], rows, slider_val)
+
+    def figure_key(self, data_selected, year_selected, graph_selected, team_selected, position_selected,
+                   stat_selected, stat2_selected, slider_val, scoring):
+        """
+        Builds the figure cache key of the user's selections, normalized so selections giving the same figure
+        share a key: team/position order doesn't matter, the second stat only matters for the scatter plot,
+        the slider isn't used by the best lineup and team comparison graphs and the scoring values only matter
+        for the fantasy statistics. The figure mode and the lineup's roster slots are part of the key, a shared
+        figure cache backend can serve workers built with different ones.
+
+        Parameters:
+        The same as build_figure
+
+        Returns:
+        str: The figure cache key
+        """
+        #The league presets graph is always fantasy statistics and doesn't show the selected stats
+        if graph_selected == 'presets':
+            data_selected, stat_selected = False, None
+        stats = tuple(stat_selected) if isinstance(stat_selected, list) else stat_selected
+        weights = None if data_selected else tuple(self.fantasy_model.engine.weights(scoring).tolist())
+        lineup = None
+        if graph_selected == 'lineup':
+            slots = self.nhl_model.lineup.slots
+            lineup = (tuple((slot, count, tuple(positions)) for slot, (count, positions) in slots.items()),
+                      self.nhl_model.lineup.team_cap)
+        return self.figure_cache.key(
+            self.figure_mode,
+            'real' if data_selected else 'fantasy',
+            year_selected,
+            graph_selected,
+            tuple(sorted(team_selected or ())),
+            tuple(sorted(position_selected or ())),
+            stats,
+            stat2_selected if graph_selected == 'scatter' else None,
+            slider_val if graph_selected not in ('lineup', 'teams') else None,
+            weights,
+            lineup,
+        )
+
+    def selected_stats(self, data_selected, graph_selected, stat_selected, stat2_selected):
+        """
+        Replaces selected stats which aren't options of the selected data (ie. 'f_points' just after switching to
+        real statistics, or a cleared dropdown) with the first stat option of the data, and a list of stats with
+        its first stat for the graphs of one stat. The dropdowns are only reconfigured after the request of a
+        real/fantasy or graph switch.
+
+        Parameters:
+        The same as build_figure
+
+        Returns:
+        tuple: (stat_selected, stat2_selected), a list of stats for the fantasy bar and best lineup graphs
+        """
+        options = self.stat_options(data_selected, graph_selected)
+        values = {option['value'] for option in options}
+        first = options[0]['value']
+        stats = stat_selected if isinstance(stat_selected, list) else [stat_selected]
+        stats = [stat for stat in stats if stat in values] or [first]
+        if data_selected or graph_selected not in ('bar', 'lineup'):
+            stat_selected = stats[0]
+        else:
+            stat_selected = stats if isinstance(stat_selected, list) else stats[0]
+        if stat2_selected not in values:
+            stat2_selected = first
+        return stat_selected, stat2_selected
+
+    def stat_options(self, data_selected, graph_selected):
+        """
+        Gets the stat dropdown options of the selected data and graph
+
+        Parameters:
+        The same as build_figure
+
+        Returns:
+        list: Dropdown options, only the counting stats for the team comparison of real statistics (team totals
+              of per game rates or percentiles are meaningless)
+        """
+        if not data_selected:
+            return self.fantasy_model.f_options
+        return self.nhl_model.counting_options if graph_selected == 'teams' else self.nhl_model.all_options
+
+    @staticmethod
+    def figure_structure(data_selected, graph_selected, stat_selected, stat2_selected):
+        """
+        Gets the selections fixing a figure's traces, axes and legend. Figures with the same structure only differ
+        in their trace values and title.
+
+        Parameters:
+        The same as build_figure
+
+        Returns:
+        list: JSON-able structure of the figure, kept in the session's figure_state store
+        """
+        #One trace per scoring whatever the selected data and stats
+        if graph_selected == 'presets':
+            return ['fantasy', graph_selected, [], None]
+        stats = list(stat_selected) if isinstance(stat_selected, list) else [stat_selected]
+
+        #One trace per position whatever the stat, only its name is in the axis titles
+        if graph_selected == 'teams':
+            stats = stats[:1]
+        return ['real' if data_selected else 'fantasy', graph_selected, stats,
+                stat2_selected if graph_selected == 'scatter' else None]
+
+    @staticmethod
+    def figure_patch(fig):
+        """
+        Builds a partial update replacing the trace values and title of the displayed figure, which has the same
+        structure as fig. The layout, template and trace styling already in the browser are kept.
+
+        Parameters:
+        fig: The new plotly figure, or its JSON decoded dict when served by the figure cache
+
+        Returns:
+        Patch: The partial update of the output graph's figure
+        """
+        #Decoded from the plotly JSON so numeric arrays are sent in the same compact typed form as full figures
+        figure = json.loads(fig.to_json()) if hasattr(fig, 'to_json') else fig
+
+        patch = Patch()
+        for i, trace in enumerate(figure['data']):
+            for attribute in ('x', 'y', 'customdata'):
+                if attribute in trace:
+                    patch['data'][i][attribute] = trace[attribute]
+
+            #Per-player colors follow the values, a single trace color is part of the structure
+            color = trace.get('marker', {}).get('color')
+            if color is not None and not isinstance(color, str):
+                patch['data'][i]['marker']['color'] = color
+        patch['layout']['title']['text'] = figure['layout']['title']['text']
+        return patch
+
+    def build_figure(self, data_selected, year_selected, graph_selected, team_selected, position_selected,
+                     stat_selected, stat2_selected, slider_val, scoring):
+        """
+        Builds the figure for the user's selections without modifying any shared season data
+
+        Parameters:
+        data_selected (bool):   True for real statistics, False for fantasy statistics
+        year_selected (str):    The statistical year to reference (2020-2024) or a season range key
+        graph_selected (str):   The graph to be displayed (bar or scatter)
+        team_selected (list):   Selected team(s) to display their player's stats
+        position_selected (list): Selected position(s) to display
+        stat_selected (str or list): The selected stat, a list of stats for the fantasy bar graph
+        stat2_selected (str or None): The secondary stat of the scatter plot
+        slider_val (int):       The number of players to display
+        scoring (dict):         Fantasy scoring values used for the fantasy statistics
+
+        Returns:
+        The plotly figure, an empty dict for an unknown graph
+        """
+        #League preset comparison, always fantasy statistics whatever data is selected
+        if graph_selected == 'presets':
+            return self.build_preset_figure(year_selected, team_selected, position_selected, slider_val, scoring)
+
+        #Team comparison, answered from the season's aggregate cube without reading player rows
+        if graph_selected == 'teams':
+            return self.build_team_figure(data_selected, year_selected, team_selected, position_selected,
+                                          stat_selected, scoring)
+
+        fig = {}
+
+        #Real statistics read the season directly, fantasy statistics get a scored view of it
+        with self.timings.stage('season'):
+            df = self.nhl_model.get_df(year_selected)
+        if data_selected:
+            season = ScoredSeason(df)
+        else:
+            with self.timings.stage('scoring'):
+                season = self.fantasy_model.score_season(year_selected, scoring)
+
+        #Best roster under the model's lineup slots, by the selected stat (the sum of the selected fantasy stats)
+        if graph_selected == 'lineup':
+            return self.build_lineup_figure(season, year_selected, team_selected, position_selected, stat_selected)
+
+        info_columns = ['name', 'team', 'position']
+
+        #Graphs for real statistics
+        if data_selected:
+            if graph_selected == 'bar':
+                top = self.top_rows(season, year_selected, stat_selected, team_selected, position_selected, slider_val)
+                with self.timings.stage('figure'):
+                    fig = self.figures.ranked_bar(
+                        season.arrays(top, info_columns + [stat_selected]),
+                        stat_selected,
+                        title=f'Top {slider_val} Players Ranked By {stat_selected.capitalize()}      '
+                              f' Filters: {position_selected}, Teams: {team_selected}',
+                    )
+
+            #Scatter plot chart
+            elif graph_selected == 'scatter':
+                top = self.top_rows(season, year_selected, stat_selected, team_selected, position_selected, slider_val)
+                with self.timings.stage('figure'):
+                    fig = self.figures.ranked_scatter(
+                        season.arrays(top, info_columns + [stat_selected, stat2_selected]),
+                        stat_selected,
+                        stat2_selected,
+                        title=f'Top {slider_val} Players Ranked By {stat_selected.capitalize()}'
+                              f' and {stat2_selected.capitalize()}',
+                    )
+
+        ###---- Fantasy hockey display ---- ####
+        else:
+            #Bar graph display
+            if graph_selected == 'bar':
+
+                if isinstance(stat_selected, str):
+                    stat_selected = [stat_selected]
+
+                rows = self.filter_rows(year_selected, team_selected, position_selected)
+
+                #Summed left to right, matching a row sum of the selected columns
+                with self.timings.stage('rank'):
+                    total_f_points = np.zeros(len(rows))
+                    for stat in stat_selected:
+                        total_f_points = total_f_points + season.column(stat)[rows]
+                    order = top_n(total_f_points, np.arange(len(rows)), slider_val)
+
+                with self.timings.stage('figure'):
+                    selected_result = season.arrays(rows[order], ['name'] + stat_selected)
+                    selected_result['total_f_points'] = total_f_points[order]
+                    fig = self.figures.stacked_bar(selected_result, stat_selected,
+                                                   title=f'Top {slider_val} Fantasy Players:')
+
+            #Scatter plot display
+            elif graph_selected == 'scatter':
+                top = self.top_rows(season, year_selected, stat_selected, team_selected, position_selected, slider_val)
+                with self.timings.stage('figure'):
+                    fig = self.figures.ranked_scatter(
+                        season.arrays(top, info_columns + [stat_selected, stat2_selected]),
+                        stat_selected,
+                        stat2_selected,
+                        title=f'Top {slider_val} Players Ranked By {stat_selected}'
+                              f' and {stat2_selected}',
+                    )
+
+        return fig
+
+    def build_lineup_figure(self, season, year_selected, team_selected, position_selected, stat_selected):
+        """
+        Builds the best lineup graph: the roster with the highest total of the selected stats under the model's
+        roster slots and team cap, picked from the players matching the team and position filters
+
+        Parameters:
+        season (ScoredSeason): The season being displayed
+        The others the same as build_figure
+
+        Returns:
+        The plotly figure, a stacked bar of each picked player's selected stats labelled with their slot
+        """
+        stats = [stat_selected] if isinstance(stat_selected, str) else list(stat_selected)
+        rows = self.filter_rows(year_selected, team_selected, position_selected)
+
+        #Summed left to right, matching the fantasy bar graph's totals
+        with self.timings.stage('lineup'):
+            total = np.zeros(len(season))
+            for stat in stats:
+                total = total + season.column(stat)
+            picked, slots = self.nhl_model.best_lineup(year_selected, total, rows)
+
+        with self.timings.stage('figure'):
+            data = season.arrays(picked, ['name'] + stats)
+            data['name'] = np.array([f'{slot}: {name}' for slot, name in zip(slots, data['name'])], dtype=object)
+            data['total_f_points'] = total[picked]
+            lineup = self.nhl_model.lineup
+            roster = ', '.join(f'{count} {slot}' for slot, (count, _) in lineup.slots.items())
+            cap = f', at most {lineup.team_cap} per team' if lineup.team_cap is not None else ''
+            return self.figures.stacked_bar(data, stats, title=f'Best Lineup ({roster}{cap}):')
+
+    def build_preset_figure(self, year_selected, team_selected, position_selected, slider_val, scoring):
+        """
+        Builds the league presets graph: the top players of the session's scoring, with their fantasy points and
+        season rank under the session's scoring and each of the fantasy model's league presets. Every scoring is
+        scored in one batched pass (FantasyModel.score_presets).
+
+        Parameters:
+        The same as build_figure
+
+        Returns:
+        The plotly figure
+        """
+        presets = self.fantasy_model.f_presets
+        with self.timings.stage('season'):
+            season = ScoredSeason(self.nhl_model.get_df(year_selected))
+        with self.timings.stage('scoring'):
+            totals, ranks = self.fantasy_model.score_presets(year_selected, [scoring] + list(presets.values()))
+
+        #Players shown are the top of the session's own scoring, the first column
+        rows = self.filter_rows(year_selected, team_selected, position_selected)
+        with self.timings.stage('rank'):
+            top = top_n(totals[rows, 0], rows, slider_val)
+
+        with self.timings.stage('figure'):
+            data = season.arrays(top, ['name', 'team', 'position'])
+            data['totals'] = totals[top]
+            data['ranks'] = ranks[top]
+            return self.figures.preset_bars(data, [self.session_preset] + list(presets),
+                                            title=f'Top {slider_val} Fantasy Players Across League Presets')
+
+    def build_team_figure(self, data_selected, year_selected, team_selected, position_selected, stat_selected,
+                          scoring):
+        """
+        Builds the team comparison graph: each team's total of the selected stat stacked by position, with the
+        mean, player count and top contributor of each team and position in the hover. Read from the year's
+        aggregate cube (the fantasy model's cube of the scoring for fantasy statistics).
+
+        Every position of the current season keeps its trace, unselected positions are left empty, so changing
+        the filters only changes the trace values.
+
+        Parameters:
+        The same as build_figure, only the first stat of a list of stats is shown
+
+        Returns:
+        The plotly figure
+        """
+        stat = stat_selected[0] if isinstance(stat_selected, list) else stat_selected
+        with self.timings.stage('cube'):
+            if data_selected:
+                cube = self.nhl_model.get_cube(year_selected)
+            else:
+                cube = self.fantasy_model.get_fantasy_cube(year_selected, scoring)
+
+        with self.timings.stage('rank'):
+            data = cube.rollup(stat, self.nhl_model.positions, team_selected)
+            if position_selected:
+                hidden = ~np.isin(data['positions'], position_selected)
+                data['counts'][:, hidden] = 0
+                data['totals'][:, hidden] = 0.0
+                data['means'][:, hidden] = np.nan
+                data['top_values'][:, hidden] = np.nan
+                data['top_names'][:, hidden] = ''
+
+            #Highest team total first, ties in team order
+            order = rank_order(data['totals'].sum(axis=1))
+            data['teams'] = [data['teams'][i] for i in order]
+            for name in ('counts', 'totals', 'means', 'top_values', 'top_names'):
+                data[name] = data[name][order]
+
+        with self.timings.stage('figure'):
+            return self.figures.team_bars(data, stat,
+                                          title=f'Team Comparison: {stat.capitalize()} by Position      '
+                                                f' Filters: {position_selected}, Teams: {team_selected}')
+
     def register_callbacks(self):
         """
         This function receives the inputs given by the UI and modifies the display based on the chosen selections
@@ -28,7 +444,8 @@ class NHLController:
         :return:
         """
         @self.app.callback(
-            Output(component_id='output_container', component_property='children'),
+            Output(component_id='output_graph', component_property='figure'),
+            Output(component_id='figure_state', component_property='data'),
             [Input(component_id='select_data', component_property='value'),
              Input(component_id='select_year', component_property='value'),
              Input(component_id='select_graph', component_property='value'),
@@ -37,11 +454,16 @@ class NHLController:
              Input(component_id='select_stat', component_property='value'),
              Input(component_id='select_stat2', component_property='value'),
              Input(component_id='slider_value', component_property='value'),
-             ]
-            + [Input(component_id=label, component_property='value') for label in self.fantasy_model.f_labels]
+             Input(component_id='scoring_store', component_property='data'),
+             Input(component_id='select_seasons', component_property='value'),
+             Input(component_id='select_season_mode', component_property='value'),
+             ],
+            [State(component_id='figure_state', component_property='data'),
+             State(component_id='session_id', component_property='data')]
         )
         def update_graph(data_selected, year_selected, graph_selected, team_selected, position_selected,
-                         stat_selected, stat2_selected, slider_val, *f_inputs):
+                         stat_selected, stat2_selected, slider_val, scoring, seasons_selected, season_mode,
+                         figure_state, session_id):
             """
             This function takes multiple inputs and modifies the display based on the user's selections and
             updated inputs (if modifying fantasy values)
@@ -49,7 +471,8 @@ class NHLController:
             Parameters:
             data_selected (str):    A selected value representing the choice of displaying real statistics
                                     or fantasy statistics
-            year_selected (str):    A selected value representing the statistical year to reference (2020-2024)
+            year_selected (str):    A selected value representing the statistical year to reference (2020-2024),
+                                    'range' for the range of seasons in seasons_selected
             graph_selected (str):   A selected value representing the graph to be displayed (Bar or Scatter plot)
             team_selected (str):    Selected dropdown value representing selected team(s) to display
                                     their player's stats
@@ -57,110 +480,161 @@ class NHLController:
             stat_selected (str):    Displays the selected stat(s) to the graph chosen
             stat2_selected (str or None): The secondary stat to be displayed if chosen
             slider_val: (int):      The int representing the number of players to display on the graph (1-1000 players)
-            f_inputs: (float):      Customisable fantasy stat values. These are modifiable and will update
-                                    the fantasy display based on the given user input.
-
-            returns: A dash component is returned configured to user selected values
+            scoring: (dict):        This session's fantasy stat values from the scoring store. Only used for
+                                    this request, other sessions are unaffected.
+            seasons_selected (list): [first, last] season end years used when year_selected is 'range'
+            season_mode (str):      How the seasons of a range are combined (ie. 'total', 'per_game')
+            figure_state (list or None): Structure of the figure displayed in this session (see figure_structure)
+            session_id (str or None): Id of the page the request came from
+
+            returns:
+            output_graph: figure
+                The new figure when its structure changed, otherwise a Patch of its trace values and title
+            figure_state: data
+                The new figure's structure, no_update when the figure was patched
             """
 
-            # Convert f_inputs to a dictionary
-            f_inputs_dict = dict(zip(self.fantasy_model.f_labels, f_inputs))
-
-            # Updated fantasy inputs from user input
-            updated_f_scoring = {label: value for label, value in f_inputs_dict.items()}
-            self.fantasy_model.update_scoring(updated_f_scoring)
+            #Scoring changes made in quick succession only build the session's latest one
+            if self.coalescer is not None and session_id and ctx.triggered_id == 'scoring_store':
+                if not self.coalescer.settle(session_id):
+                    raise PreventUpdate
+
+            #Selected choices, only formatted when debug logging is enabled
+            logger.debug('Real Data: %s, Year Selected: %s, Graph Selected: %s, Teams Selected: %s, Position: %s, '
+                         'Stat: %s, Stat 2: %s, Slider: %s', data_selected, year_selected, graph_selected,
+                         team_selected, position_selected, stat_selected, stat2_selected, slider_val)
+
+            with self.timings.stage('update_graph'):
+                #A season range is looked up like a single year through its range key
+                if year_selected == 'range':
+                    year_selected = self.nhl_model.range_key(*seasons_selected, season_mode)
+
+                #Filters normalized like the figure key, a cached figure's title then reads the same for every
+                #session sharing its key whatever order the teams and positions were picked in
+                team_selected = sorted(team_selected) if team_selected else None
+                position_selected = sorted(position_selected) if position_selected else None
+
+                #The stat dropdowns keep the other data's stats for a request after the real/fantasy toggle
+                stat_selected, stat2_selected = self.selected_stats(data_selected, graph_selected, stat_selected,
+                                                                    stat2_selected)
+
+                selections = (data_selected, year_selected, graph_selected, team_selected, position_selected,
+                              stat_selected, stat2_selected, slider_val, scoring)
+                if self.figure_cache is not None:
+                    fig = self.figure_cache.get(self.figure_key(*selections), lambda: self.build_figure(*selections))
+                else:
+                    fig = self.build_figure(*selections)
+
+                #Unknown graph, nothing to patch
+                if isinstance(fig, dict) and not fig:
+                    return fig, None
+
+                structure = self.figure_structure(data_selected, graph_selected, stat_selected, stat2_selected)
+                if structure == figure_state:
+                    with self.timings.stage('patch'):
+                        return self.figure_patch(fig), no_update
+                return fig, structure
+
+        #Callback to collect the fantasy inputs into this session's scoring store, on every (debounced) edit
+        #or only when the apply button is clicked
+        f_labels = self.fantasy_model.f_labels
+        if self.view.scoring_update == 'apply':
+            scoring_dependencies = [Input(component_id='apply_scoring', component_property='n_clicks')] + \
+                                   [State(component_id=label, component_property='value') for label in f_labels]
+        else:
+            scoring_dependencies = [Input(component_id=label, component_property='value') for label in f_labels]
 
-            fig = {}
+        @self.app.callback(
+            Output(component_id='scoring_store', component_property='data'),
+            scoring_dependencies,
+            [State(component_id='scoring_store', component_property='data')]
+        )
+        def update_scoring_store(*values):
+            """
+            Stores the session's fantasy scoring values, the shared model defaults are never modified
 
-            #Selected choices
-            container = f' Real Data: {data_selected}, Year Selected: {year_selected},' \
-                        f' Graph Selected: {graph_selected} Teams Selected: {team_selected}' \
-                        f' Position: {position_selected}, Stat: {stat_selected},', \
-                        f' Stat 2: {stat2_selected}, Slider: {slider_val}'
+            Parameters:
+            values: The apply button's clicks in 'apply' mode, then the customisable fantasy stat values (float)
+                    and the scoring currently stored
 
-            #Assign dataframe for the selected year
-            dfs = self.nhl_model.get_df(year_selected)
+            Returns:
+            dict: The session's scoring values, empty inputs keep their default value
+            """
+            f_inputs, stored = values[-len(f_labels) - 1:-1], values[-1]
+            scoring = self.fantasy_model.scoring_from_inputs(f_inputs)
 
-            #Add on the fantasy statistics to the dataframe selected
-            dfs = self.fantasy_model.calc_fantasy_stats(dfs, self.fantasy_model.f_scoring)
+            #An edit which doesn't change any value (ie. typing '2.' after '2') doesn't rebuild the graph
+            if scoring == stored:
+                raise PreventUpdate
+            return scoring
 
-            #Filter by teams
-            if team_selected:
-                dfs = dfs[dfs['team'].isin(team_selected)]
+        #Pure UI reconfiguration runs in the browser unless server callbacks were asked for
+        if self.ui_callbacks == 'clientside':
+            self.register_clientside_callbacks()
+        else:
+            self.register_server_ui_callbacks()
 
-            #Filter by position
-            if position_selected:
-                dfs = dfs[dfs['position'].isin(position_selected)]
+    def register_clientside_callbacks(self):
+        """
+        Registers the UI reconfiguration callbacks (season range block, slider range, stat dropdowns) as clientside
+        callbacks, defined in assets/clientside.js. They only map the selected data/graph/year to static marks,
+        options and styles, so they run in the browser without a request to the server. The stat dropdown options
+        are embedded once in the layout's stat_options store.
+        :return:
+        """
+        self.app.clientside_callback(
+            ClientsideFunction(namespace='ui', function_name='update_season_range'),
+            Output(component_id='season_range_block', component_property='style'),
+            [Input(component_id='select_year', component_property='value')]
+        )
 
-            #Graphs for real statistics
-            if data_selected:
-                if graph_selected == 'bar':
-                    selected_result = dfs.nlargest(slider_val, stat_selected)
-                    fig = px.bar(
-                        selected_result,
-                        x='name',
-                        y=stat_selected,
-                        title=f'Top {slider_val} Players Ranked By {stat_selected.capitalize()}      '
-                              f' Filters: {position_selected}, Teams: {team_selected}',
-                        color=selected_result[stat_selected],
-                        color_continuous_scale='Bluered_r',
-                        hover_data={'name': True, 'team': True, 'position': True}
+        self.app.clientside_callback(
+            ClientsideFunction(namespace='ui', function_name='update_slider_val'),
+            Output(component_id='slider_value', component_property='marks'),
+            Output(component_id='slider_value', component_property='max'),
+            Output(component_id='slider_value', component_property='min'),
+            Output(component_id='slider_value', component_property='step'),
+            [Input(component_id='select_graph', component_property='value')]
+        )
 
-                    )
+        self.app.clientside_callback(
+            ClientsideFunction(namespace='ui', function_name='update_dropdowns'),
+            Output(component_id='select_stat', component_property='options'),
+            Output(component_id='select_stat', component_property='multi'),
+            Output(component_id='select_stat2', component_property='options'),
+            Output(component_id='select_stats_block2', component_property='style'),
+            Output(component_id='fantasy_scores_block', component_property='style'),
+            [Input(component_id='select_data', component_property='value'),
+             Input(component_id='select_graph', component_property='value')],
+            [State(component_id='stat_options', component_property='data')]
+        )
 
-                #Scatter plot chart
-                elif graph_selected == 'scatter':
-                    selected_result = dfs.nlargest(slider_val, stat_selected)
-                    fig = px.scatter(
-                        selected_result,
-                        x=stat2_selected,
-                        y=stat_selected,
-                        title=f'Top {slider_val} Players Ranked By {stat_selected.capitalize()}'
-                              f' and {stat2_selected.capitalize()}',
-                        color=selected_result[stat_selected],
-                        color_continuous_scale='Bluered_r',
-                        labels={'name': 'Player Name', 'team': 'Team', 'position': 'Position'},
-                        hover_data={'name': True, 'team': True, 'position': True}
-                    )
+    def register_server_ui_callbacks(self):
+        """
+        Registers the UI reconfiguration callbacks as server callbacks, the same as register_clientside_callbacks
+        but every change is a request to the server
+        :return:
+        """
+        #Callback to show the season range selection
+        @self.app.callback(
+            Output(component_id='season_range_block', component_property='style'),
+            [Input(component_id='select_year', component_property='value')]
+        )
+        def update_season_range(select_year):
+            """
+            Shows the season range slider and mode dropdown when "Seasons: range" is the selected year
 
-            ###---- Fantasy hockey display ---- ####
-            else:
-                #Bar graph display
-                if graph_selected == 'bar':
-
-                    if isinstance(stat_selected, str):
-                        stat_selected = [stat_selected]
-
-                    dfs.loc[:, 'total_f_points'] = dfs.loc[:, stat_selected].sum(axis=1).astype(float)
-                    selected_result = dfs.nlargest(slider_val, 'total_f_points')
-
-                    fig = px.bar(
-                        selected_result,
-                        x='name',
-                        y=stat_selected,
-                        title=f'Top {slider_val} Fantasy Players:',
-                        labels={'name': 'Player Name'},
-                        hover_data={'total_f_points': ':.1f'}
-                    )
-                    fig.update_layout(barmode='stack')
-
-                #Scatter plot display
-                elif graph_selected == 'scatter':
-                    selected_result = dfs.nlargest(slider_val, stat_selected)
-                    fig = px.scatter(
-                        selected_result,
-                        x=stat2_selected,
-                        y=stat_selected,
-                        title=f'Top {slider_val} Players Ranked By {stat_selected}'
-                              f' and {stat2_selected}',
-                        color=selected_result[stat_selected],
-                        color_continuous_scale='Bluered_r',
-                        labels={'name': 'Player Name', 'team': 'Team', 'position': 'Position'},
-                        hover_data={'name': True, 'team': True, 'position': True}
-                    )
+            Parameters:
+            select_year (str): The selected year, 'range' for a range of seasons
 
-            print(container)
-            return dcc.Graph(figure=fig)
+            Returns:
+            season_range_block: style
+                none: No display for the season range block
+                inline-block: Visible season range block
+            """
+            if select_year == 'range':
+                return {'width': "40%", 'display': 'inline-block'}
+            return {'width': "40%", 'display': 'none'}
 
         #Callback to update the slider value based on the graph
         @self.app.callback(
@@ -184,8 +658,8 @@ class NHLController:
             min_val (int): Min value for the slider (0)
             step_val (int): Step value for the slider (10 or 50)
             """
-            #Set the slider's range and values for the bar graph
-            if select_graph == 'bar':
+            #Set the slider's range and values for the bar graphs
+            if select_graph != 'scatter':
                 marks_val = {i: str(i) for i in range(0, 101, 10)}
                 max_val = 100
                 min_val = 0
@@ -243,10 +717,23 @@ class NHLController:
                 none: No display for the fantasy scores block
                 inline-block: Visible fantasy stat block
             """
+            #League presets graph: fantasy scoring inputs, the selected stats aren't shown
+            if select_graph == 'presets':
+                options = self.nhl_model.all_options if select_data else self.fantasy_model.f_options
+                return options, not select_data, [], {'width': "20%", 'display': 'none'},\
+                       {'width': "50%", 'display': 'inline-block'}
+
+            #Team comparison graph: one stat, the fantasy scoring inputs with fantasy statistics
+            if select_graph == 'teams':
+                options = self.stat_options(select_data, select_graph)
+                hidden = {'width': "20%", 'display': 'none'}
+                scores = hidden if select_data else {'width': "50%", 'display': 'inline-block'}
+                return options, False, [], hidden, scores
+
             #Real data display
             if select_data:
                 #Show bar graph dropdown format (1 Stat selection dropdown)
-                if select_graph == 'bar':
+                if select_graph != 'scatter':
                     return self.nhl_model.all_options, False, [], {'width': "20%", 'display': 'none'},\
                            {'width': "20%", 'display': 'none'}
 
@@ -257,8 +744,8 @@ class NHLController:
 
             #Fantasy display
             else:
-                #Bar Graph
-                if select_graph == 'bar':
+                #Bar Graphs
+                if select_graph != 'scatter':
                     return self.fantasy_model.f_options, True, [], {'width': "20%", 'display': 'none'},\
                        {'width': "50%", 'display': 'inline-block'}
                 #Scatter Plot
@@ -0,0 +1,74 @@
+import numpy as np
+
+#Counting stats given derived versions, the selectable stats of NHLModel.all_options
+RATE_STATS = ['points', 'goals', 'assists', 'shots_on_goal', 'faceoffswon', 'takeaways', 'giveaways',
+              'blocked_shots', 'hits', 'penalty_mins', 'penaltiesdrawn', 'pp_points', 'pp_goals', 'pp_assists',
+              'pk_points', 'pk_goals', 'pk_assists']
+
+#Fewest games played for a player's rates to count, rates of a few games would top every rate ranking
+MIN_GAMES = 10
+
+#Suffix of each derived column -> dropdown label suffix
+DERIVED = {
+    '_per_game': ' / Game',
+    '_per_60': ' / 60 Min',
+    '_pct': ' Percentile',
+}
+
+
+def is_derived(column):
+    """
+    Checks whether a column is one of the derived columns
+
+    Parameters:
+    column (str): The column name
+
+    Returns:
+    bool: True for a '<stat>_per_game', '<stat>_per_60' or '<stat>_pct' column of a RATE_STATS stat
+    """
+    return any(column.endswith(suffix) and column[:-len(suffix)] in RATE_STATS for suffix in DERIVED)
+
+
+def derived_columns(columns):
+    """
+    Derives the per game, per 60 minute and league percentile version of each RATE_STATS stat
+
+    Rates are 0 for a player with fewer than MIN_GAMES games played or without minutes. The percentile is the
+    share of the players (0-100) whose total is at or below the player's, so the league leader is 100.
+
+    Parameters:
+    columns: Column name -> array of counting stat totals, including 'games_played' and 'mins_played'
+             (ie. a season data frame)
+
+    Returns:
+    dict: Derived column name -> float32 array, '<stat>_per_game', '<stat>_per_60' then '<stat>_pct' of each stat
+    """
+    games = np.asarray(columns['games_played'], dtype=np.float64)
+    minutes = np.asarray(columns['mins_played'], dtype=np.float64)
+    qualified = games >= MIN_GAMES
+    derived = {}
+    for stat in RATE_STATS:
+        if stat not in columns:
+            continue
+        totals = np.asarray(columns[stat], dtype=np.float64)
+        derived[f'{stat}_per_game'] = np.divide(totals, games, out=np.zeros_like(totals),
+                                                where=qualified & (games > 0)).astype(np.float32)
+        derived[f'{stat}_per_60'] = np.divide(totals * 60.0, minutes, out=np.zeros_like(totals),
+                                              where=qualified & (minutes > 0)).astype(np.float32)
+        at_or_below = np.searchsorted(np.sort(totals), totals, side='right')
+        derived[f'{stat}_pct'] = (at_or_below * 100.0 / max(len(totals), 1)).astype(np.float32)
+    return derived
+
+
+def derived_options(options):
+    """
+    Builds the dropdown options of the derived columns of the given stat options
+
+    Parameters:
+    options (list): Dropdown options of counting stats (ie. {"label": "Goals", "value": "goals"})
+
+    Returns:
+    list: A '/ Game', '/ 60 Min' and 'Percentile' option for each option of a RATE_STATS stat, grouped by suffix
+    """
+    return [{"label": f"{option['label']}{label}", "value": f"{option['value']}{suffix}"}
+            for suffix, label in DERIVED.items() for option in options if option['value'] in RATE_STATS]
@@ -0,0 +1,313 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+class ExpressFigures:
+    """
+    Builds the graphs with plotly.express from a data frame of the selected rows
+
+    Every method takes the selected rows as a dict of column -> np.ndarray, in display order.
+    """
+    def ranked_bar(self, data, stat, title):
+        """
+        Bar graph of players ranked by a stat, colored by the stat
+
+        Parameters:
+        data (dict): 'name', 'team', 'position' and stat -> values of the selected rows
+        stat (str): The ranked stat
+        title (str): The graph title
+
+        Returns:
+        The plotly figure
+        """
+        df = pd.DataFrame(data)
+        return px.bar(
+            df,
+            x='name',
+            y=stat,
+            title=title,
+            color=df[stat],
+            color_continuous_scale='Bluered_r',
+            hover_data={'name': True, 'team': True, 'position': True}
+        )
+
+    def ranked_scatter(self, data, stat, stat2, title):
+        """
+        Scatter plot of players ranked by a stat against a second stat, colored by the ranked stat
+
+        Parameters:
+        data (dict): 'name', 'team', 'position', stat and stat2 -> values of the selected rows
+        stat (str): The ranked stat, on the y axis
+        stat2 (str): The second stat, on the x axis
+        title (str): The graph title
+
+        Returns:
+        The plotly figure
+        """
+        df = pd.DataFrame(data)
+        return px.scatter(
+            df,
+            x=stat2,
+            y=stat,
+            title=title,
+            color=df[stat],
+            color_continuous_scale='Bluered_r',
+            labels={'name': 'Player Name', 'team': 'Team', 'position': 'Position'},
+            hover_data={'name': True, 'team': True, 'position': True}
+        )
+
+    def stacked_bar(self, data, stats, title):
+        """
+        Stacked bar graph of players ranked by the total of several stats
+
+        Parameters:
+        data (dict): 'name', each stat and 'total_f_points' -> values of the selected rows
+        stats (list): The stacked stats, bottom first
+        title (str): The graph title
+
+        Returns:
+        The plotly figure
+        """
+        fig = px.bar(
+            pd.DataFrame(data),
+            x='name',
+            y=stats,
+            title=title,
+            labels={'name': 'Player Name'},
+            hover_data={'total_f_points': ':.1f'}
+        )
+        fig.update_layout(barmode='stack')
+        return fig
+
+    def preset_bars(self, data, presets, title):
+        """
+        Grouped bar graph of players' fantasy points under several scorings, one bar per scoring
+
+        Parameters:
+        data (dict): 'name', 'team', 'position' -> values of the selected rows, plus 'totals' and 'ranks'
+                     (rows x scorings) arrays of each row's fantasy points and season rank under each scoring
+        presets (list): Name of each scoring, in the column order of totals and ranks
+        title (str): The graph title
+
+        Returns:
+        The plotly figure
+        """
+        #One row per (player, scoring), players first
+        count = len(data['name'])
+        df = pd.DataFrame({
+            'name': np.repeat(data['name'], len(presets)),
+            'team': np.repeat(data['team'], len(presets)),
+            'position': np.repeat(data['position'], len(presets)),
+            'preset': np.tile(presets, count),
+            'f_points': data['totals'].ravel(),
+            'rank': data['ranks'].ravel(),
+        })
+        return px.bar(
+            df,
+            x='name',
+            y='f_points',
+            color='preset',
+            barmode='group',
+            title=title,
+            labels={'name': 'Player Name', 'preset': 'Scoring'},
+            hover_data={'team': True, 'position': True, 'rank': True}
+        )
+
+    def team_bars(self, data, stat, title):
+        """
+        Stacked bar graph of teams' totals of a stat, one bar segment per position
+
+        Parameters:
+        data (dict): 'teams' and 'positions' -> the axes, in display order, plus (teams x positions) arrays of each
+                     team and position's 'totals', 'means', 'counts', 'top_names' and 'top_values'
+        stat (str): The stat
+        title (str): The graph title
+
+        Returns:
+        The plotly figure
+        """
+        #One row per (team, position), teams first
+        count = len(data['teams'])
+        df = pd.DataFrame({
+            'team': np.repeat(data['teams'], len(data['positions'])),
+            'position': np.tile(data['positions'], count),
+            stat: data['totals'].ravel(),
+            'mean': data['means'].ravel(),
+            'players': data['counts'].ravel(),
+            'top player': data['top_names'].ravel(),
+            'top value': data['top_values'].ravel(),
+        })
+        return px.bar(
+            df,
+            x='team',
+            y=stat,
+            color='position',
+            barmode='stack',
+            title=title,
+            labels={'team': 'Team', 'position': 'Position'},
+            hover_data={'mean': ':.2f', 'players': True, 'top player': True, 'top value': ':.1f'}
+        )
+
+
+class GraphObjectFigures:
+    """
+    Builds the same graphs as ExpressFigures directly with plotly.graph_objects from the NumPy arrays
+
+    Skips plotly.express's data frame copy, column resolution and trace grouping, which is most of the build time
+    of a 500 player scatter plot. Scatter plots can optionally be drawn with WebGL (Scattergl), which renders large
+    plots faster in the browser.
+
+    Attributes:
+        webgl (bool): True to draw scatter plots with Scattergl
+    """
+    def __init__(self, webgl=False):
+        """
+        Initialize the GraphObjectFigures
+
+        Parameters:
+        webgl (bool): True to draw scatter plots with Scattergl
+        """
+        self.webgl = webgl
+
+    @staticmethod
+    def color_layout(stat, title, x_title, y_title):
+        """
+        Gets the layout of a graph colored by a stat on the 'Bluered_r' continuous scale
+
+        Returns:
+        dict: The layout
+        """
+        return {
+            'title': {'text': title},
+            'xaxis': {'title': {'text': x_title}},
+            'yaxis': {'title': {'text': y_title}},
+            'coloraxis': {'colorscale': 'Bluered_r', 'colorbar': {'title': {'text': stat}}},
+            'legend': {'tracegroupgap': 0},
+        }
+
+    def ranked_bar(self, data, stat, title):
+        """
+        Bar graph of players ranked by a stat, colored by the stat, see ExpressFigures.ranked_bar
+        """
+        values = data[stat]
+        bar = go.Bar(
+            x=data['name'],
+            y=values,
+            marker={'color': values, 'coloraxis': 'coloraxis'},
+            customdata=np.column_stack([data['team'], data['position']]),
+            hovertemplate=f'name=%{{x}}<br>{stat}=%{{y}}<br>team=%{{customdata[0]}}'
+                          f'<br>position=%{{customdata[1]}}<extra></extra>',
+            showlegend=False,
+        )
+        layout = self.color_layout(stat, title, 'name', stat)
+        layout['barmode'] = 'relative'
+        return go.Figure(data=[bar], layout=layout)
+
+    def ranked_scatter(self, data, stat, stat2, title):
+        """
+        Scatter plot of players ranked by a stat against a second stat, see ExpressFigures.ranked_scatter
+        """
+        trace = go.Scattergl if self.webgl else go.Scatter
+        scatter = trace(
+            x=data[stat2],
+            y=data[stat],
+            mode='markers',
+            marker={'color': data[stat], 'coloraxis': 'coloraxis'},
+            customdata=np.column_stack([data['name'], data['team'], data['position']]),
+            hovertemplate=f'{stat2}=%{{x}}<br>{stat}=%{{y}}<br>Player Name=%{{customdata[0]}}'
+                          f'<br>Team=%{{customdata[1]}}<br>Position=%{{customdata[2]}}<extra></extra>',
+            showlegend=False,
+        )
+        return go.Figure(data=[scatter], layout=self.color_layout(stat, title, stat2, stat))
+
+    def stacked_bar(self, data, stats, title):
+        """
+        Stacked bar graph of players ranked by the total of several stats, see ExpressFigures.stacked_bar
+        """
+        #One trace per stat, colored from the template's colorway like plotly.express
+        bars = [
+            go.Bar(
+                x=data['name'],
+                y=data[stat],
+                name=stat,
+                legendgroup=stat,
+                customdata=data['total_f_points'],
+                hovertemplate=f'variable={stat}<br>Player Name=%{{x}}<br>value=%{{y}}'
+                              f'<br>total_f_points=%{{customdata:.1f}}<extra></extra>',
+                showlegend=True,
+            )
+            for stat in stats
+        ]
+        layout = {
+            'title': {'text': title},
+            'xaxis': {'title': {'text': 'Player Name'}},
+            'yaxis': {'title': {'text': 'value'}},
+            'legend': {'title': {'text': 'variable'}, 'tracegroupgap': 0},
+            'barmode': 'stack',
+        }
+        return go.Figure(data=bars, layout=layout)
+
+    def preset_bars(self, data, presets, title):
+        """
+        Grouped bar graph of players' fantasy points under several scorings, see ExpressFigures.preset_bars
+        """
+        bars = [
+            go.Bar(
+                x=data['name'],
+                y=data['totals'][:, k],
+                name=preset,
+                legendgroup=preset,
+                customdata=np.column_stack([data['team'], data['position'], data['ranks'][:, k]]),
+                hovertemplate=f'Scoring={preset}<br>Player Name=%{{x}}<br>f_points=%{{y}}'
+                              f'<br>team=%{{customdata[0]}}<br>position=%{{customdata[1]}}'
+                              f'<br>rank=%{{customdata[2]}}<extra></extra>',
+                showlegend=True,
+            )
+            for k, preset in enumerate(presets)
+        ]
+        layout = {
+            'title': {'text': title},
+            'xaxis': {'title': {'text': 'Player Name'}},
+            'yaxis': {'title': {'text': 'f_points'}},
+            'legend': {'title': {'text': 'Scoring'}, 'tracegroupgap': 0},
+            'barmode': 'group',
+        }
+        return go.Figure(data=bars, layout=layout)
+
+    def team_bars(self, data, stat, title):
+        """
+        Stacked bar graph of teams' totals of a stat, one bar segment per position, see ExpressFigures.team_bars
+        """
+        bars = [
+            go.Bar(
+                x=data['teams'],
+                y=data['totals'][:, j],
+                name=position,
+                legendgroup=position,
+                customdata=np.column_stack([data['means'][:, j], data['counts'][:, j], data['top_names'][:, j],
+                                            data['top_values'][:, j]]),
+                hovertemplate=f'Position={position}<br>Team=%{{x}}<br>{stat}=%{{y}}'
+                              f'<br>mean=%{{customdata[0]:.2f}}<br>players=%{{customdata[1]}}'
+                              f'<br>top player=%{{customdata[2]}}<br>top value=%{{customdata[3]:.1f}}<extra></extra>',
+                showlegend=True,
+            )
+            for j, position in enumerate(data['positions'])
+        ]
+        layout = {
+            'title': {'text': title},
+            'xaxis': {'title': {'text': 'Team'}},
+            'yaxis': {'title': {'text': stat}},
+            'legend': {'title': {'text': 'Position'}, 'tracegroupgap': 0},
+            'barmode': 'stack',
+        }
+        return go.Figure(data=bars, layout=layout)
+
+
+#Figure builder of each figure mode accepted by NHLController
+FIGURE_MODES = {
+    'express': ExpressFigures,
+    'graph_objects': GraphObjectFigures,
+    'webgl': lambda: GraphObjectFigures(webgl=True),
+}
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class LocalFigureBackend:
+    """
+    In-process figure store with LRU eviction and a time to live, only serves the process it lives in
+    """
+    def __init__(self, maxsize=256, ttl=3600):
+        """
+        Initialize the LocalFigureBackend
+
+        Parameters:
+        maxsize (int): Most figures kept before the least recently used is evicted
+        ttl (float): Seconds a figure is served after being stored
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Gets a stored figure
+
+        Parameters:
+        key (str): The figure key
+
+        Returns:
+        tuple or None: (figure JSON, seconds it took to build), None when missing or expired
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[2] > self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, figure_json, build_seconds):
+        """
+        Stores a figure
+
+        Parameters:
+        key (str): The figure key
+        figure_json (str): The serialized figure
+        build_seconds (float): Seconds it took to build the figure
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.entries[key] = (figure_json, build_seconds, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+
+class FileFigureBackend:
+    """
+    Figure store in a directory, one file per figure, shared by every worker process pointed at the directory
+
+    Stands in for a shared cache server. Figures expire ttl seconds after being written, and once more than
+    maxsize are stored the oldest written are removed.
+    """
+    def __init__(self, directory, maxsize=1024, ttl=3600):
+        """
+        Initialize the FileFigureBackend
+
+        Parameters:
+        directory (str): Directory holding the figures, created if missing
+        maxsize (int): Most figures kept before the oldest are removed
+        ttl (float): Seconds a figure is served after being written
+        """
+        self.directory = directory
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.writes = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        """
+        Gets a stored figure
+
+        Parameters:
+        key (str): The figure key
+
+        Returns:
+        tuple or None: (figure JSON, seconds it took to build), None when missing or expired
+        """
+        path = self.path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path) as f:
+                build_seconds, figure_json = f.read().split('\n', 1)
+        except (OSError, ValueError):
+            return None
+        return figure_json, float(build_seconds)
+
+    def set(self, key, figure_json, build_seconds):
+        """
+        Stores a figure, the build time is kept on the first line of the file
+
+        Parameters:
+        key (str): The figure key
+        figure_json (str): The serialized figure
+        build_seconds (float): Seconds it took to build the figure
+
+        Returns:
+            None
+        """
+        path = self.path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(f'{build_seconds}\n{figure_json}')
+        os.replace(tmp_path, path)
+
+        self.writes += 1
+        if self.writes % 64 == 0:
+            self.prune()
+
+    def prune(self):
+        """
+        Removes the oldest written figures beyond maxsize
+
+        Returns:
+            None
+        """
+        paths = [entry.path for entry in os.scandir(self.directory) if entry.name.endswith('.json')]
+        if len(paths) <= self.maxsize:
+            return
+        paths.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in paths[:len(paths) - self.maxsize]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class FigureCache:
+    """
+    Cache of serialized figures keyed by the normalized inputs they were built from
+
+    Attributes:
+        backend: LocalFigureBackend or FileFigureBackend holding the figures
+        hits (int): Figures served from the cache
+        misses (int): Figures which had to be built
+        saved_seconds (float): Build time saved by the hits
+    """
+
+    #Hit rate + saved time are logged every this many lookups
+    log_every = 100
+
+    def __init__(self, backend=None):
+        """
+        Initialize the FigureCache
+
+        Parameters:
+        backend (LocalFigureBackend or FileFigureBackend or None): Figure store, None for a LocalFigureBackend
+        """
+        self.backend = backend if backend is not None else LocalFigureBackend()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def key(*inputs):
+        """
+        Builds a figure key from already normalized inputs
+
+        Parameters:
+        inputs: Hashable, repr-stable values (str, int, float, bool, None and tuples of them)
+
+        Returns:
+        str: Hex digest of the inputs
+        """
+        return hashlib.sha1(repr(inputs).encode()).hexdigest()
+
+    def get(self, key, build):
+        """
+        Gets the figure of a key, building and storing it on a miss
+
+        Parameters:
+        key (str): Key from FigureCache.key
+        build (callable): Called with no arguments on a miss, returns the plotly figure
+
+        Returns:
+        The figure as a dict decoded from its stored JSON on a hit, what build returned on a miss
+        """
+        entry = self.backend.get(key)
+        if entry is not None:
+            self.record(hit=True, seconds=entry[1])
+            return json.loads(entry[0])
+
+        start = time.perf_counter()
+        fig = build()
+        figure_json = fig.to_json() if hasattr(fig, 'to_json') else None
+        build_seconds = time.perf_counter() - start
+        if figure_json is not None:
+            self.backend.set(key, figure_json, build_seconds)
+        self.record(hit=False, seconds=build_seconds)
+        return fig
+
+    def record(self, hit, seconds):
+        """
+        Counts a lookup and logs the hit rate every log_every lookups
+
+        Parameters:
+        hit (bool): True when the figure was served from the cache
+        seconds (float): Build time of the figure, saved on a hit
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if hit:
+                self.hits += 1
+                self.saved_seconds += seconds
+            else:
+                self.misses += 1
+            lookups = self.hits + self.misses
+            if lookups % self.log_every == 0:
+                logger.info('Figure cache: %d lookups, %.1f%% hits, %.3f s of figure building saved',
+                            lookups, 100 * self.hits / lookups, self.saved_seconds)
+
+    def stats(self):
+        """
+        Gets the cache counters
+
+        Returns:
+        dict: hits, misses, hit_rate and saved_seconds
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'saved_seconds': round(self.saved_seconds, 4),
+            }
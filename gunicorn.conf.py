@@ -0,0 +1,17 @@
+#gunicorn settings of the production server, see wsgi.py
+#    gunicorn -c gunicorn.conf.py wsgi:server
+import os
+
+bind = os.environ.get('NHL_BIND', '0.0.0.0:8050')
+
+#Worker processes, each with a pool of threads. Callbacks spend most of their time in NumPy/pandas, so a few
+#threads per worker overlap their I/O while the processes scale across cores
+workers = int(os.environ.get('NHL_WORKERS', 4))
+threads = int(os.environ.get('NHL_THREADS', 4))
+worker_class = 'gthread'
+
+#Import wsgi.py (load + index every season) once in the master, the forked workers share it copy-on-write
+preload_app = True
+
+timeout = 60
+accesslog = os.environ.get('NHL_ACCESS_LOG')
@@ -0,0 +1,257 @@
+import heapq
+
+import numpy as np
+
+from season_index import rank_order
+
+
+class LineupOptimizer:
+    """
+    Picks the roster with the highest total value under roster slot counts and an optional cap per team
+
+    Each slot type accepts a set of positions (ie. 'C' only centres, 'UTIL' any skater). The best roster is a
+    maximum weight assignment of players to slots with at most team_cap players of any team, solved exactly as a
+    min-cost flow (source -> team -> player -> slot type -> sink) by successive shortest paths.
+
+    Only players that can be in a best roster are put in the flow network: of each team and position, the best
+    min(team_cap, slots accepting the position). Any lower player of a roster could be swapped for an unpicked
+    better one of the same team and position without breaking a constraint. Without a team cap this leaves a few
+    players per position, with one a few hundred of a full season.
+
+    Attributes:
+        slots (dict): Slot type -> (count, positions accepted), in display order
+        team_cap (int or None): Most players picked from one team, None for no cap
+    """
+
+    #Common fantasy roster: 2 C, 2 LW, 2 RW, 4 D and a utility skater
+    default_slots = {
+        'C': (2, ('C',)),
+        'LW': (2, ('L',)),
+        'RW': (2, ('R',)),
+        'D': (4, ('D',)),
+        'UTIL': (1, ('C', 'L', 'R', 'D')),
+    }
+
+    def __init__(self, slots=None, team_cap=None):
+        """
+        Initialize the LineupOptimizer
+
+        Parameters:
+        slots (dict or None): Slot type -> (count, positions accepted), None for default_slots
+        team_cap (int or None): Most players picked from one team, None for no cap
+        """
+        self.slots = dict(slots if slots is not None else self.default_slots)
+        self.team_cap = team_cap
+
+    def accepting(self, position):
+        """
+        Gets the number of slots accepting a position
+
+        Parameters:
+        position (str): The position (ie. 'C')
+
+        Returns:
+        int: The number of slots of every slot type accepting the position
+        """
+        return sum(count for count, positions in self.slots.values() if position in positions)
+
+    def candidates(self, values, positions, teams):
+        """
+        Gets the players that can be in a best roster, see the class docstring
+
+        Parameters:
+        values (np.ndarray): Value of each player
+        positions (np.ndarray): Position of each player
+        teams (np.ndarray): Team of each player
+
+        Returns:
+        np.ndarray: The candidate players, highest value first (ties keep their original order)
+        """
+        limits = {position: self.accepting(position) for position in np.unique(positions)}
+        if self.team_cap is not None:
+            limits = {position: min(limit, self.team_cap) for position, limit in limits.items()}
+
+        #Without a team cap the scan stops once every position is full
+        remaining = sum(limits.values()) if self.team_cap is None else None
+        picked = []
+        counts = {}
+        for i in rank_order(values):
+            group = (positions[i], teams[i] if self.team_cap is not None else None)
+            count = counts.get(group, 0)
+            if count < limits[positions[i]]:
+                counts[group] = count + 1
+                picked.append(i)
+                if remaining is not None:
+                    remaining -= 1
+                    if not remaining:
+                        break
+        return np.array(picked, dtype=np.int64)
+
+    def solve(self, values, positions, teams):
+        """
+        Picks the best roster
+
+        Slots are filled even by players of negative value, fewer players are picked only when the constraints
+        leave no player for a slot.
+
+        Parameters:
+        values (np.ndarray): Value of each player (ie. fantasy points)
+        positions (np.ndarray): Position of each player
+        teams (np.ndarray): Team of each player
+
+        Returns:
+        tuple: (picked players, slot type of each), players as positions in the given arrays, ordered by slot type
+               then highest value first
+        """
+        values = np.asarray(values, dtype=np.float64)
+        positions = np.asarray(positions)
+        teams = np.asarray(teams)
+        candidates = self.candidates(values, positions, teams)
+        slot_types = list(self.slots)
+        team_names = list(dict.fromkeys(teams[candidates])) if self.team_cap is not None else []
+
+        #Nodes: source, sink, teams, candidates, slot types
+        source, sink = 0, 1
+        team_nodes = {team: 2 + t for t, team in enumerate(team_names)}
+        player_base = 2 + len(team_names)
+        slot_base = player_base + len(candidates)
+        network = FlowNetwork(slot_base + len(slot_types))
+
+        for team, node in team_nodes.items():
+            network.add_edge(source, node, self.team_cap, 0.0)
+        for p, i in enumerate(candidates):
+            start = team_nodes[teams[i]] if self.team_cap is not None else source
+            network.add_edge(start, player_base + p, 1, -values[i])
+            for s, slot in enumerate(slot_types):
+                if positions[i] in self.slots[slot][1]:
+                    network.add_edge(player_base + p, slot_base + s, 1, 0.0)
+        for s, slot in enumerate(slot_types):
+            network.add_edge(slot_base + s, sink, self.slots[slot][0], 0.0)
+
+        network.min_cost_flow(source, sink, sum(count for count, _ in self.slots.values()))
+
+        #A player is picked when the flow goes out through one of its slot edges
+        picks = []
+        for p, i in enumerate(candidates):
+            for edge in network.edges_from(player_base + p):
+                if network.to[edge] >= slot_base and network.capacity[edge] == 0:
+                    picks.append((network.to[edge] - slot_base, -values[i], i))
+        picks.sort()
+        return np.array([i for _, _, i in picks], dtype=np.int64), [slot_types[s] for s, _, _ in picks]
+
+
+class FlowNetwork:
+    """
+    Residual graph of a min-cost flow problem with integer capacities and float costs
+
+    Attributes:
+        to (list): Head node of each edge, edge e ^ 1 is the reverse of edge e
+        capacity (list): Remaining capacity of each edge
+        cost (list): Cost of one unit of flow through each edge
+        graph (list): Edges leaving each node
+    """
+    def __init__(self, nodes):
+        """
+        Initialize an empty FlowNetwork
+
+        Parameters:
+        nodes (int): Number of nodes
+        """
+        self.to = []
+        self.capacity = []
+        self.cost = []
+        self.graph = [[] for _ in range(nodes)]
+
+    def add_edge(self, u, v, capacity, cost):
+        """
+        Adds an edge and its zero capacity reverse edge
+
+        Returns:
+            None
+        """
+        self.graph[u].append(len(self.to))
+        self.to.append(v)
+        self.capacity.append(capacity)
+        self.cost.append(cost)
+        self.graph[v].append(len(self.to))
+        self.to.append(u)
+        self.capacity.append(0)
+        self.cost.append(-cost)
+
+    def edges_from(self, u):
+        """
+        Gets the forward edges leaving a node
+
+        Returns:
+        list: The edges added from u
+        """
+        return [edge for edge in self.graph[u] if not edge & 1]
+
+    def potentials(self, source):
+        """
+        Gets the shortest path distance from the source of each node, by Bellman-Ford over the initial edges
+
+        Returns:
+        list: Distance of each node, inf when unreachable
+        """
+        distances = [float('inf')] * len(self.graph)
+        distances[source] = 0.0
+        for _ in range(len(self.graph)):
+            changed = False
+            for u, edges in enumerate(self.graph):
+                if distances[u] == float('inf'):
+                    continue
+                for edge in edges:
+                    v = self.to[edge]
+                    if self.capacity[edge] and distances[u] + self.cost[edge] < distances[v]:
+                        distances[v] = distances[u] + self.cost[edge]
+                        changed = True
+            if not changed:
+                break
+        return distances
+
+    def min_cost_flow(self, source, sink, flow):
+        """
+        Sends up to flow units from source to sink, one shortest (Dijkstra with potentials) path at a time,
+        which is the minimum cost for every amount of flow sent along the way
+
+        Returns:
+        int: The units sent, less than flow when no path is left
+        """
+        potential = self.potentials(source)
+        sent = 0
+        while sent < flow:
+            distances = [float('inf')] * len(self.graph)
+            previous = [-1] * len(self.graph)
+            distances[source] = 0.0
+            heap = [(0.0, source)]
+            while heap:
+                distance, u = heapq.heappop(heap)
+                if distance > distances[u]:
+                    continue
+                for edge in self.graph[u]:
+                    v = self.to[edge]
+                    if not self.capacity[edge] or potential[v] == float('inf'):
+                        continue
+                    #Reduced costs are non-negative, up to rounding
+                    candidate = distance + max(0.0, self.cost[edge] + potential[u] - potential[v])
+                    if candidate < distances[v]:
+                        distances[v] = candidate
+                        previous[v] = edge
+                        heapq.heappush(heap, (candidate, v))
+            if distances[sink] == float('inf'):
+                break
+
+            for node, distance in enumerate(distances):
+                if distance < float('inf'):
+                    potential[node] += distance
+
+            #Every path goes through a player edge of capacity 1, one unit at a time
+            node = sink
+            while node != source:
+                edge = previous[node]
+                self.capacity[edge] -= 1
+                self.capacity[edge ^ 1] += 1
+                node = self.to[edge ^ 1]
+            sent += 1
+        return sent
@@ -1,21 +1,49 @@
-import pandas as pd
+import threading
+from collections import OrderedDict
+
+from aggregate_cube import AggregateCube
+from derived_stats import derived_options
+from lineup import LineupOptimizer
+from multi_season import MultiSeasonTable
+from scoring import ScoredCache, ScoredSeason, ScoringEngine
+from season_index import SeasonIndex, rank_columns
+from season_store import SeasonStore
+from similarity import SimilarityIndex
 
 class NHLModel:
-    def __init__(self, files):
+    def __init__(self, files=None, store=None):
         """
         Initialize NHLModel with a list of files
 
         Parameters:
-        files (list): A list of CSV file names containing nhl player data, to be loaded into data frames
-                      Does NOT contain the '.csv' extension
+        files (list or None): A list of CSV file names containing nhl player data, to be loaded into data frames
+                              Does NOT contain the '.csv' extension
+                              When None the season files are discovered in the working directory
+        store (SeasonStore or None): A season store already registering the files, shared between models.
+                                     When None the files are registered in a new store
         """
-        #List of files given to the model
-        self.files = files
+        #Season registry, shared with any other model given the same store. Seasons load on first use
+        self.store = store if store is not None else SeasonStore(files)
+
+        #List of files given to the model, newest season first
+        self.files = list(self.store.files.values())
+
+        #Team/position row masks and stat rank orders of each year, built on first use
+        self.indexes = {}
+
+        #Team x position aggregates of the counting stats of each year, built at load or on first use
+        self.cubes = {}
 
-        #Data frames of each year
-        self.dfs = [pd.read_csv(f'{file}.csv') for file in self.files]
-        self.teams = self.dfs[0]['team'].unique().tolist()
-        self.positions = self.dfs[0]['position'].unique().tolist()
+        #Player similarity index over every season of each rate ('per_game', 'per_60'), built on first use
+        self.similarity_indexes = {}
+
+        #Roster slots and team cap of the best lineup
+        self.lineup = LineupOptimizer()
+
+        #Teams and positions of the current season
+        current = self.get_df(self.store.seasons()[0])
+        self.teams = current['team'].unique().tolist()
+        self.positions = current['position'].unique().tolist()
 
         # Selectable stats for all situations (5v5, 5v4, 4v5...)
         self.all_options = [
@@ -38,6 +66,12 @@ class NHLModel:
             {"label": "PK Assists", "value": "pk_assists"}
         ]
 
+        #Stats which add up over players, the only ones summed into team totals
+        self.counting_options = self.all_options
+
+        #Per game, per 60 minute and league percentile versions of each stat, derived once when a season loads
+        self.all_options = self.counting_options + derived_options(self.counting_options)
+
     #Grabs the dataframe of the selected year
     def get_df(self,year):
         """
@@ -47,37 +81,185 @@ class NHLModel:
         year (str): The year of data we wish to use
 
         Returns:
-        The dataframe of the selected year
+        The dataframe of the selected year (loaded on first request), None for an unknown year
+        """
+        df = self.store.get(year)
+        if df is None:
+            return self.get_range_df(year)
+        return df
+
+    @property
+    def dfs(self):
+        """
+        Gets the data frame of every year, loading any year not loaded yet
+
+        Returns:
+        list: The data frames of each year, newest first
+        """
+        return self.store.frames
+
+    def season_options(self):
+        """
+        Gets the selectable years of the year dropdown
+
+        Returns:
+        list: Dropdown options of each year, newest first (ie. {"label": "2023-2024", "value": '2024'})
+        """
+        return [{"label": f"{int(year) - 1}-{year}", "value": year} for year in self.store.seasons()]
+
+    def range_key(self, start, end, mode):
+        """
+        Builds the key of a season range, accepted by get_df and get_index like a single year
+
+        Parameters:
+        start (int): First season end year of the range
+        end (int): Last season end year of the range
+        mode (str): One of MultiSeasonTable.modes
+
+        Returns:
+        str: The range key (ie. '2020-2024:total')
+        """
+        return f'{int(start)}-{int(end)}:{mode}'
+
+    def get_range_df(self, key):
+        """
+        Gets the dataframe of a season range key from the multi-season table
+
+        Parameters:
+        key (str): A key from range_key
+
+        Returns:
+        One row per player summarising the range, None when the key isn't a valid range key
+        """
+        try:
+            years, mode = key.split(':')
+            start, end = (int(year) for year in years.split('-'))
+        except (AttributeError, ValueError):
+            return None
+        if mode not in MultiSeasonTable.modes:
+            return None
+        return self.store.multi_season().range_frame(start, end, mode)
+
+    def season_years(self):
+        """
+        Gets the season end years available for a season range
+
+        Returns:
+        list: The years in ascending order
+        """
+        return sorted(int(year) for year in self.store.seasons())
+
+    def get_index(self, year):
+        """
+        Gets the team/position and stat rank index of the specified year
+
+        Parameters:
+        year (str): The year of data we wish to use
+
+        Returns:
+        SeasonIndex: The row masks and rank orders of the selected year
+        """
+        index = self.indexes.get(year)
+        if index is None:
+            index = SeasonIndex(self.get_df(year), [option['value'] for option in self.all_options])
+            self.indexes[year] = index
+        return index
+
+    def get_cube(self, year):
+        """
+        Gets the team x position aggregate cube of the specified year
+
+        Parameters:
+        year (str): The year of data we wish to use
+
+        Returns:
+        AggregateCube: Player counts, totals and top contributors of the counting_options stats per team and
+                       position. Totals of the derived rates and percentiles would be meaningless.
+        """
+        cube = self.cubes.get(year)
+        if cube is None:
+            cube = AggregateCube(self.get_df(year), [option['value'] for option in self.counting_options])
+            self.cubes[year] = cube
+        return cube
+
+    def get_similarity_index(self, rate='per_game'):
+        """
+        Gets the player similarity index over every season
+
+        Parameters:
+        rate (str): 'per_game' or 'per_60', what the compared stats are normalized by
+
+        Returns:
+        SimilarityIndex: The similarity index of the all_options stats of every player's seasons
+        """
+        index = self.similarity_indexes.get(rate)
+        if index is None:
+            index = SimilarityIndex(self.store.multi_season(), [option['value'] for option in self.all_options],
+                                    rate)
+            self.similarity_indexes[rate] = index
+        return index
+
+    def similar_players(self, playerid, k=10, rate='per_game', year=None, teams=None, positions=None,
+                        years=None, min_games=10):
         """
+        Finds the seasons of other players most like one of a player's seasons (ie. for trade and waiver targets)
 
-        match year:
-            case'2024':
-                return self.dfs[0]
-            case '2023':
-                return self.dfs[1]
-            case '2022':
-                return self.dfs[2]
-            case '2021':
-                return self.dfs[3]
-            case '2020':
-                return self.dfs[4]
-            case _:
-                return None
+        Parameters:
+        playerid (int): The player's id
+        k (int): Number of similar seasons to return
+        rate (str): 'per_game' or 'per_60', what the compared stats are normalized by
+        year (int or None): The player's season end year to compare, None for their latest season
+        teams (list or None): Only return players of these team(s), None or empty for all teams
+        positions (list or None): Only return players of these position(s), None or empty for all positions
+        years (list or None): Only return these season end years, None or empty for every season
+        min_games (int): Fewest games played of a returned season
+
+        Returns:
+        A data frame of the similar seasons, most similar first (see SimilarityIndex.frame),
+        None when the player didn't play the season
+        """
+        index = self.get_similarity_index(rate)
+        row = index.player_row(playerid, year)
+        if row is None:
+            return None
+        rows, distances = index.query([row], k, teams, positions, years, min_games)[0]
+        return index.frame(rows, distances)
+
+    def best_lineup(self, year, values, rows=None, optimizer=None):
+        """
+        Picks the best roster of the specified year under roster slot counts and an optional team cap
+
+        Parameters:
+        year (str): The year of data we wish to use
+        values (np.ndarray): Value of each player of the year (ie. their fantasy points)
+        rows (np.ndarray or None): Row positions of the players that can be picked, None for every player
+        optimizer (LineupOptimizer or None): The roster slots and team cap, None for the model's lineup
+
+        Returns:
+        tuple: (row positions of the picked players, slot type of each), ordered by slot type then value
+        """
+        df = self.get_df(year)
+        if rows is None:
+            rows = self.get_index(year).all_rows
+        optimizer = optimizer if optimizer is not None else self.lineup
+        picked, slots = optimizer.solve(values[rows], df['position'].to_numpy()[rows], df['team'].to_numpy()[rows])
+        return rows[picked], slots
 
 
 #Subclass of NHLModel, expands and uses the NHLModel data but also incorporates its own features
 class FantasyModel(NHLModel):
-    def __init__(self, files):
+    def __init__(self, files=None, store=None):
         """
         This class focuses on the fantasy section of the application and contains the data sets, labels, and
         values used by the view, controller.
 
         Parameters:
         files (string): The dataframe loaded in of a specific year
+        store (SeasonStore or None): A season store shared with the NHLModel, avoids parsing the files twice
         """
-        super().__init__(files)
+        super().__init__(files, store)
 
-        #Default fantasy scoring values
+        #Default fantasy scoring values, each session's own values are passed to score_season instead
         self.f_scoring = {
             'f_goal': 2.0,
             'f_ppg': 1.0,
@@ -100,6 +282,45 @@ class FantasyModel(NHLModel):
         self.f_categories = ['f_goals', 'f_ppgs', 'f_shgs','f_sogs','f_assists','f_ppas','f_shas',
                          'f_faceoff_wins','f_takeaways','f_giveaways','f_hits','f_blocks', 'f_points']
 
+        #Scoring of common league formats, compared with the session's own scoring in the "League Presets" graph
+        #Values not given score 0
+        self.f_presets = {
+            'Goals + Assists': dict(dict.fromkeys(self.f_labels, 0.0), f_goal=1.0, f_assist=1.0),
+            'Power Play Bonus': dict(dict.fromkeys(self.f_labels, 0.0), f_goal=2.0, f_ppg=1.0, f_shg=1.0,
+                                     f_assist=1.0, f_ppa=0.5, f_sha=0.5, f_sog=0.1),
+            'Banger': dict(dict.fromkeys(self.f_labels, 0.0), f_goal=2.0, f_assist=1.0, f_sog=0.2, f_hit=0.5,
+                           f_block=0.5),
+            'Two-Way': dict(dict.fromkeys(self.f_labels, 0.0), f_goal=2.0, f_shg=1.0, f_assist=1.0, f_sha=1.0,
+                            f_faceoff_win=0.2, f_takeaway=0.5, f_giveaway=-0.5, f_block=0.5),
+        }
+
+        #Real stat column scored by each fantasy input value
+        self.f_sources = {
+            'f_goal': 'goals',
+            'f_ppg': 'pp_goals',
+            'f_shg': 'pk_goals',
+            'f_sog': 'shots_on_goal',
+            'f_assist': 'assists',
+            'f_ppa': 'pp_assists',
+            'f_sha': 'pk_assists',
+            'f_faceoff_win': 'faceoffswon',
+            'f_takeaway': 'takeaways',
+            'f_giveaway': 'giveaways',
+            'f_hit': 'hits',
+            'f_block': 'blocked_shots',
+        }
+
+        #Scores every category with one matrix x weight-vector product
+        self.engine = ScoringEngine(self.f_sources, self.f_categories)
+
+        #Scored seasons by (season, scoring values), most UI interactions don't change the scoring
+        self.scored_cache = ScoredCache()
+
+        #Aggregate cubes of the fantasy stats by scored cache key, least recently used first
+        self.fantasy_cubes = OrderedDict()
+        self.fantasy_cubes_size = 32
+        self.fantasy_cubes_lock = threading.Lock()
+
         # All selectable stats
         self.f_options = [
             {"label": "Points", "value": "f_points"},
@@ -130,25 +351,89 @@ class FantasyModel(NHLModel):
         Returns:
         df: A dataframe with the new fantasy stats calculated appeneded
         """
-        df['f_goals'] = df['goals'] * scoring['f_goal']
-        df['f_ppgs'] = df['pp_goals'] * scoring['f_ppg']
-        df['f_shgs'] = df['pk_goals'] * scoring['f_shg']
-        df['f_sogs'] = df['shots_on_goal'] * scoring['f_sog']
-        df['f_assists'] = df['assists'] * scoring['f_assist']
-        df['f_ppas'] = df['pp_assists'] * scoring['f_ppa']
-        df['f_shas'] = df['pk_assists'] * scoring['f_sha']
-        df['f_faceoff_wins'] = df['faceoffswon'] * scoring['f_faceoff_win']
-        df['f_takeaways'] = df['takeaways'] * scoring['f_takeaway']
-        df['f_giveaways'] = df['giveaways'] * scoring['f_giveaway']
-        df['f_hits'] = df['hits'] * scoring['f_hit']
-        df['f_blocks'] = df['blocked_shots'] * scoring['f_block']
-        df['f_points'] = df[['f_goals', 'f_ppgs', 'f_shgs','f_sogs','f_assists','f_ppas','f_shas',
-                             'f_faceoff_wins','f_takeaways','f_giveaways','f_hits','f_blocks']].sum(axis=1)
+        df[self.f_categories] = self.engine.score(self.engine.stat_matrix(df), scoring)
         return df
 
+    def score_season(self, year, scoring):
+        """
+        Scores the selected year without modifying its shared dataframe, reusing the season's stat matrix
+        and any earlier scoring of the year with the same values
+
+        Parameters:
+        year (str): The year of data we wish to use
+        scoring (dict): A dictionary of keys (Stat columns) and values (User defined scoring values)
+
+        Returns:
+        ScoredSeason: The selected year's dataframe with the fantasy stats in an aligned read-only array
+        """
+        df = self.get_df(year)
+        weights = self.engine.weights(scoring)
+        key = self.scored_cache.key(year, weights)
+        values = self.scored_cache.get(key, lambda: self.engine.score(self.engine.season_matrix(year, df), weights))
+        return ScoredSeason(df, self.f_categories, values)
+
+    def score_presets(self, year, scorings):
+        """
+        Scores the selected year under several fantasy scorings in one pass (ie. the scoring of each league),
+        without modifying its shared dataframe
+
+        Parameters:
+        year (str): The year of data we wish to use
+        scorings (list): K scoring dictionaries or weight vectors
+
+        Returns:
+        tuple: (totals, ranks) (players x K) arrays, each player's fantasy points and rank in the year under
+               each scoring. Rank 1 is the highest total, ties keep their season order
+        """
+        df = self.get_df(year)
+        totals = self.engine.score_totals(self.engine.season_matrix(year, df), self.engine.weight_matrix(scorings))
+        return totals, rank_columns(totals)
+
+    def get_fantasy_cube(self, year, scoring):
+        """
+        Gets the team x position aggregate cube of the fantasy stats of the selected year under a scoring,
+        reduced once per (year, scoring values) from the scored season
+
+        Parameters:
+        year (str): The year of data we wish to use
+        scoring (dict): A dictionary of keys (Stat columns) and values (User defined scoring values)
+
+        Returns:
+        AggregateCube: Player counts, totals and top contributors of the f_categories per team and position
+        """
+        key = self.scored_cache.key(year, self.engine.weights(scoring))
+        with self.fantasy_cubes_lock:
+            cube = self.fantasy_cubes.get(key)
+            if cube is not None:
+                self.fantasy_cubes.move_to_end(key)
+                return cube
+
+        season = self.score_season(year, scoring)
+        cube = AggregateCube(season.base, self.f_categories, season.values)
+        with self.fantasy_cubes_lock:
+            self.fantasy_cubes[key] = cube
+            while len(self.fantasy_cubes) > self.fantasy_cubes_size:
+                self.fantasy_cubes.popitem(last=False)
+        return cube
+
+    def scoring_from_inputs(self, f_inputs):
+        """
+        Builds a session's scoring dictionary from its fantasy input values without changing the defaults
+
+        Parameters:
+        f_inputs (list): The user given values in f_labels order, None for an empty input
+
+        Returns:
+        dict: The scoring values, empty inputs keep their default value
+        """
+        scoring = dict(self.f_scoring)
+        scoring.update({label: value for label, value in zip(self.f_labels, f_inputs) if value is not None})
+        return scoring
+
     def update_scoring(self, scoring_values):
         """
-        This function recalculates the fantasy scoring dictionary when given user inputted values
+        This function recalculates the default fantasy scoring dictionary when given user inputted values
+        Shared by every session of the process, per-session values should come from scoring_from_inputs
 
         Parameters:
         scoring_values (dict): The user given values to be used instead of the default values
@@ -0,0 +1,204 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from derived_stats import derived_columns, is_derived
+
+
+class MultiSeasonTable:
+    """
+    Every season in one long table sorted by playerid then year, built once from the season frames
+
+    Each player's seasons are contiguous rows, so pooled totals, per-game rates and rolling windows over any
+    range of seasons are grouped reductions (np.add.reduceat) over the selected rows. The frames built for a
+    range are kept in a small LRU cache.
+
+    Attributes:
+        years (np.ndarray): Season end year of each row (the '2024' season is 2023-2024)
+        playerids (np.ndarray): Player id of each row
+        columns (list): Numeric stat columns held in matrix
+        matrix (np.ndarray): (rows x columns) float matrix of the stats
+        info: Data frame of each row's name, team and position
+    """
+
+    #Modes of a season range frame, 'rolling_N' is each player's best N consecutive seasons (by peak_stat)
+    modes = ['total', 'per_game', 'rolling_2', 'rolling_3']
+
+    #Stat ranking each player's windows in the rolling modes, every column of the row is from the same window
+    peak_stat = 'points'
+
+    def __init__(self, frames, maxsize=32):
+        """
+        Initialize the MultiSeasonTable and build the long table
+
+        Parameters:
+        frames (list): The compact data frame of each season
+        maxsize (int): Most range frames kept before the least recently used is evicted
+        """
+        #Stat columns present in every season (column order and spelling vary between the files), derived rate
+        #and percentile columns are derived again from each range's totals rather than pooled
+        first = frames[0]
+        self.columns = [column for column in first.columns
+                        if column not in ('playerid', 'season') and pd.api.types.is_numeric_dtype(first[column])
+                        and not is_derived(column) and all(column in df.columns for df in frames)]
+        self.integer_columns = {column for column in self.columns if pd.api.types.is_integer_dtype(first[column])}
+
+        years = np.concatenate([df['season'].to_numpy(dtype=np.int64) + 1 for df in frames])
+        playerids = np.concatenate([df['playerid'].to_numpy(dtype=np.int64) for df in frames])
+        order = np.lexsort((years, playerids))
+
+        self.years = years[order]
+        self.playerids = playerids[order]
+        self.matrix = np.ascontiguousarray(
+            np.vstack([df[self.columns].to_numpy(dtype=np.float64) for df in frames])[order])
+
+        #Categories differ between seasons, unify them on the combined columns
+        self.info = pd.DataFrame({
+            column: pd.Categorical(np.concatenate([df[column].astype(str).to_numpy() for df in frames])[order])
+            for column in ('name', 'team', 'position')
+        })
+
+        self.maxsize = maxsize
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+
+    def available_years(self):
+        """
+        Gets the season end years held in the table
+
+        Returns:
+        list: The years in ascending order
+        """
+        return np.unique(self.years).tolist()
+
+    def pooled(self, start, end):
+        """
+        Sums every stat of each player over a range of seasons
+
+        Parameters:
+        start (int): First season end year of the range
+        end (int): Last season end year of the range
+
+        Returns:
+        tuple: (playerids, latest row of each player in the range, seasons played, (players x columns) sums)
+        """
+        selected = np.flatnonzero((self.years >= start) & (self.years <= end))
+        playerids = self.playerids[selected]
+        starts = np.flatnonzero(np.r_[True, playerids[1:] != playerids[:-1]])
+        stops = np.r_[starts[1:], len(selected)]
+
+        sums = np.add.reduceat(self.matrix[selected], starts, axis=0) if len(selected) else \
+            np.zeros((0, len(self.columns)))
+        return playerids[starts], selected[stops - 1], stops - starts, sums
+
+    def rolling(self, window, start, end):
+        """
+        Sums every stat of each player over each window of consecutive seasons within a range
+
+        Parameters:
+        window (int): Number of seasons in each window
+        start (int): First season end year of the range
+        end (int): Last season end year of the range
+
+        Returns:
+        tuple: (playerids, window end years, latest row of each player in the window, (rows x columns) sums),
+               one row per player per window they played in, sorted by playerid then window end
+        """
+        ends = range(min(start + window - 1, end), end + 1)
+        windows = [self.pooled(max(start, stop - window + 1), stop) for stop in ends]
+
+        playerids = np.concatenate([pooled[0] for pooled in windows])
+        window_ends = np.concatenate([np.full(len(pooled[0]), stop) for pooled, stop in zip(windows, ends)])
+        latest = np.concatenate([pooled[1] for pooled in windows])
+        sums = np.vstack([pooled[3] for pooled in windows])
+
+        order = np.lexsort((window_ends, playerids))
+        return playerids[order], window_ends[order], latest[order], sums[order]
+
+    def peak(self, window, start, end):
+        """
+        Gets each player's best window of consecutive seasons within a range: the window with the highest
+        peak_stat total, ties going to the latest window. Every column is taken from that one window.
+
+        Parameters:
+        window (int): Number of seasons in each window
+        start (int): First season end year of the range
+        end (int): Last season end year of the range
+
+        Returns:
+        tuple: (playerids, latest row of each player in the range, (players x columns) best window sums)
+        """
+        playerids, window_ends, latest, sums = self.rolling(window, start, end)
+        starts = np.flatnonzero(np.r_[True, playerids[1:] != playerids[:-1]][:len(playerids)])
+        stops = np.r_[starts[1:], len(playerids)]
+
+        #Rows are sorted by playerid then window end, so each player's latest row is the last of their group
+        best = np.lexsort((-window_ends, -sums[:, self.columns.index(self.peak_stat)], playerids))[starts]
+        return playerids[starts], latest[stops - 1], sums[best]
+
+    def range_frame(self, start, end, mode='total'):
+        """
+        Gets one row per player summarising a range of seasons, cached by (start, end, mode)
+
+        Parameters:
+        start (int): First season end year of the range
+        end (int): Last season end year of the range
+        mode (str): 'total' for pooled totals, 'per_game' for pooled totals per game played,
+                    'rolling_N' for each player's best N consecutive seasons by peak_stat
+
+        Returns:
+        A data frame shaped like a season frame (playerid, name, team, position, stats...) plus the number
+        of seasons each player played in the range. Name, team and position are from the latest season.
+        """
+        key = (start, end, mode)
+        with self.lock:
+            df = self.frames.get(key)
+            if df is not None:
+                self.frames.move_to_end(key)
+                return df
+
+        df = self.build_frame(start, end, mode)
+        with self.lock:
+            self.frames[key] = df
+            while len(self.frames) > self.maxsize:
+                self.frames.popitem(last=False)
+        return df
+
+    def build_frame(self, start, end, mode):
+        """
+        Builds the frame of a season range, see range_frame
+
+        Returns:
+        The range's data frame
+        """
+        playerids, latest, seasons, sums = self.pooled(start, end)
+        if mode.startswith('rolling_'):
+            peak_ids, _, peaks = self.peak(int(mode.split('_')[1]), start, end)
+            sums = peaks[np.searchsorted(peak_ids, playerids)]
+        elif mode not in ('total', 'per_game'):
+            raise ValueError(f'Unknown season range mode: {mode}')
+
+        #Rates and percentiles of the range's totals (best window totals for the rolling modes)
+        derived = derived_columns({column: sums[:, j] for j, column in enumerate(self.columns)})
+
+        if mode == 'per_game':
+            games = sums[:, self.columns.index('games_played')].copy()
+            rates = np.divide(sums, games[:, None], out=np.zeros_like(sums), where=games[:, None] > 0)
+
+            #Games and minutes stay as totals, every other stat becomes a per game rate
+            for column in ('games_played', 'mins_played'):
+                j = self.columns.index(column)
+                rates[:, j] = sums[:, j]
+            sums = rates
+
+        df = self.info.iloc[latest].reset_index(drop=True)
+        df.insert(0, 'playerid', playerids)
+        df['seasons'] = seasons
+        for j, column in enumerate(self.columns):
+            if column in self.integer_columns and mode != 'per_game':
+                df[column] = sums[:, j].astype(np.int64)
+            else:
+                df[column] = sums[:, j]
+        return pd.concat([df, pd.DataFrame(derived, index=df.index)], axis=1)
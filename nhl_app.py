@@ -1,7 +1,21 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import wait
+
 import dash
+from flask import g, jsonify, request
+from coalesce import RequestCoalescer
+from figure_cache import FigureCache, FileFigureBackend, LocalFigureBackend
 from model import NHLModel, FantasyModel
+from season_store import SeasonStore, SnapshotCache
+from similarity import SimilarityIndex
 from view import NHLView
 from controller import NHLController
+from timings import Timings
+
+logger = logging.getLogger(__name__)
 
 
 class NHLApp:
@@ -10,46 +24,249 @@ class NHLApp:
 
     Attributes:
         app (dash.Dash): Dash application instance
+        store (SeasonStore): Parsed season data shared by both models
         nhl_model (NHLModel): Model responsible for real nhl statistics
         fantasy_model (FantasyModel): Model responsible for fantasy statistics
         view (NHLView): View responsible for the Dash layout and UI
         controller (NHLController): Responsible for managing interactions between model + view
+        figure_cache (FigureCache): Figures already built for the same selections
+        coalescer (RequestCoalescer or None): Drops a session's scoring changes superseded by a newer one
+        timings (Timings): Latency histograms of each callback stage, served under /metrics
+        startup (dict): Seconds from start until the app was ready, the first request and all seasons loaded
     """
-    def __init__(self, files):
+    def __init__(self, files=None, cache_dir='.season_cache', data_dir='.', preload='background',
+                 figure_cache_dir=None, figure_mode='graph_objects', scoring_update='debounce', coalesce_seconds=0.15,
+                 ui_callbacks='clientside'):
         """
         Initializes the NHLApp class with provided data files
 
         Parameters:
-            files (list): List of file names, each containing nhl data of a specific year
+            files (list or None): List of file names, each containing nhl data of a specific year
+                                  When None every season file in data_dir is used
+            cache_dir (str or None): Directory for the binary season snapshots, None always parses the CSVs
+            data_dir (str): Directory searched for season files when files is None
+            preload (str or None): How the seasons other than the current one are loaded
+                                   'background': On a thread pool once the app can accept requests
+                                   'eager': Before returning, ie. before worker processes are forked
+                                   None: Each season when first requested
+            figure_cache_dir (str or None): Directory of a figure cache shared by every worker pointed at it,
+                                            None keeps the figure cache in this process
+            figure_mode (str): 'graph_objects', 'webgl' (WebGL scatter plots) or 'express', see NHLController
+            scoring_update (str): 'debounce' or 'apply', when edited fantasy scoring values are applied, see NHLView
+            coalesce_seconds (float): Settle window of a session's scoring changes, a change superseded within it
+                                      is never built, and each change built waits up to it. 0 builds every
+                                      change at once. Sessions are tracked per process, see RequestCoalescer
+                                      before using it with several workers.
+            ui_callbacks (str): 'clientside' or 'server', where the slider and dropdowns are reconfigured
         """
+        self.startup = {'started': time.perf_counter(), 'ready_seconds': None, 'first_request_seconds': None,
+                        'preload_seconds': None}
 
         # Initialize the Dash app
         self.app = dash.Dash(__name__)
 
+        #Register the seasons, each is parsed once (or read from its snapshot) when first requested and
+        #both models share the same frames
+        cache = SnapshotCache(cache_dir) if cache_dir else None
+        self.store = SeasonStore(files, cache, data_dir)
+
         #Initialize models
-        self.nhl_model = NHLModel(files)
-        self.fantasy_model = FantasyModel(files)
+        self.nhl_model = NHLModel(files, self.store)
+        self.fantasy_model = FantasyModel(files, self.store)
 
         #Initialize view with models
-        self.view = NHLView(self.nhl_model, self.fantasy_model)
+        self.view = NHLView(self.nhl_model, self.fantasy_model, scoring_update)
+
+        #Figures already built for the same selections, shared between workers when given a directory
+        backend = FileFigureBackend(figure_cache_dir) if figure_cache_dir else LocalFigureBackend()
+        self.figure_cache = FigureCache(backend)
+        self.coalescer = RequestCoalescer(coalesce_seconds) if coalesce_seconds else None
+
+        #Latency histograms of each callback stage and of the whole callback request
+        self.timings = Timings()
 
         #Initialize controller with app, models, view
-        self.controller = NHLController(self.app, self.nhl_model, self.fantasy_model, self.view)
+        self.controller = NHLController(self.app, self.nhl_model, self.fantasy_model, self.view, self.figure_cache,
+                                        figure_mode, self.coalescer, ui_callbacks,
+                                        self.timings)
+
+        #Set up the layout, served with a new session id on each page load
+        self.app.layout = self.view.serve_layout
+
+        #Expose cache + store counters for scraping
+        self.app.server.add_url_rule('/metrics', 'metrics', self.metrics)
+
+        #Players most like a given player, for trade and waiver decisions
+        self.app.server.add_url_rule('/similar/<int:playerid>', 'similar', self.similar)
+        self.app.server.before_request(self.record_first_request)
+        self.app.server.before_request(self.start_request_timer)
+        self.app.server.after_request(self.record_request_time)
+
+        #Only the current season was loaded so far (by the models), the app can now accept requests
+        self.startup['ready_seconds'] = self.elapsed()
+        logger.info('Ready to accept requests after %.3f s', self.startup['ready_seconds'])
+
+        if preload == 'eager':
+            for year in self.store.seasons():
+                self.store.get(year)
+            self.record_preload_done()
+        elif preload == 'background':
+            threading.Thread(target=self.wait_for_preload, args=(self.store.preload(),),
+                             name='season-preload-wait', daemon=True).start()
+
+    def elapsed(self):
+        """
+        Gets the seconds since the app started initializing
+
+        Returns: float
+        """
+        return round(time.perf_counter() - self.startup['started'], 4)
+
+    def record_first_request(self):
+        """
+        Records the time to the first request served, registered as a Flask before_request hook
+
+        Returns: None
+        """
+        if self.startup['first_request_seconds'] is None:
+            self.startup['first_request_seconds'] = self.elapsed()
+            logger.info('First request received after %.3f s', self.startup['first_request_seconds'])
+
+    def start_request_timer(self):
+        """
+        Records when a request started, registered as a Flask before_request hook
+
+        Returns: None
+        """
+        g.request_start = time.perf_counter()
+
+    def record_request_time(self, response):
+        """
+        Records the time a callback request took, including Dash serializing the response, registered as a Flask
+        after_request hook
+
+        Parameters:
+            response: The Flask response
+
+        Returns: The response unchanged
+        """
+        if request.path.endswith('/_dash-update-component') and 'request_start' in g:
+            self.timings.record('callback_request', time.perf_counter() - g.request_start)
+        return response
+
+    def wait_for_preload(self, futures):
+        """
+        Waits for the background season loads, then records the time they finished
+
+        Parameters:
+            futures (list): Futures from SeasonStore.preload
+
+        Returns: None
+        """
+        wait(futures)
+        self.record_preload_done()
+
+    def record_preload_done(self):
+        """
+        Records the time every season finished loading
 
-        # Set up the layout
-        self.app.layout = self.view.create_layout()
+        Returns: None
+        """
+        self.startup['preload_seconds'] = self.elapsed()
+        logger.info('All %d seasons loaded after %.3f s', len(self.store.files), self.startup['preload_seconds'])
+
+    def metrics(self):
+        """
+        Reports the runtime counters of the app as JSON, served at /metrics
 
-    def run(self):
+        Returns: A Flask JSON response
         """
-        Runs the dash server
+        return jsonify({
+            'scoring_cache': self.fantasy_model.scored_cache.stats(),
+            'figure_cache': self.figure_cache.stats(),
+            'coalescing': self.coalescer.stats() if self.coalescer is not None else None,
+            'season_store': self.store.stats(),
+            'startup': {key: value for key, value in self.startup.items() if key != 'started'},
+            'timings': self.timings.summary(),
+        })
+
+    def similar(self, playerid):
+        """
+        Reports the seasons of other players most like a player's season as JSON, served at /similar/<playerid>
+
+        Query parameters (all optional): k (default 10), rate ('per_game' or 'per_60'), year (the player's season
+        end year, default their latest), min_games (default 10), and comma separated teams, positions and years
+        filtering the similar seasons
+
+        Parameters:
+            playerid (int): The player's id
+
+        Returns: A Flask JSON response, 404 for a player or season not in the data, 400 for an unknown rate or a
+                 number parameter which isn't an integer
+        """
+        def listed(name):
+            value = request.args.get(name)
+            return value.split(',') if value else None
+
+        rate = request.args.get('rate', 'per_game')
+        if rate not in SimilarityIndex.rates:
+            return jsonify({'error': f'Unknown rate: {rate}'}), 400
+
+        #Numbers are validated, a typo silently replaced by the default would answer a different query
+        numbers = {}
+        for name, default in (('k', 10), ('year', None), ('min_games', 10)):
+            value = request.args.get(name)
+            try:
+                numbers[name] = int(value) if value is not None else default
+            except ValueError:
+                return jsonify({'error': f'{name} must be an integer: {value}'}), 400
+        try:
+            years = [int(year) for year in listed('years') or ()]
+        except ValueError:
+            return jsonify({'error': f"years must be comma separated integers: {request.args.get('years')}"}), 400
+
+        df = self.nhl_model.similar_players(playerid, numbers['k'], rate, numbers['year'], listed('teams'),
+                                            listed('positions'), years, numbers['min_games'])
+        if df is None:
+            return jsonify({'error': f'No season of player {playerid}'}), 404
+        return jsonify(json.loads(df.to_json(orient='records')))
+
+    def warm(self):
+        """
+        Loads every season and builds its rank index, scoring matrix and team x position aggregate cubes (of the
+        real statistics and of the default fantasy scoring) plus the multi-season table and player similarity
+        indexes up front.
+        Called before a WSGI server forks its workers (see wsgi.py) so every worker shares them copy-on-write
+        instead of building its own.
+
+        Returns: None
+        """
+        for year in self.store.seasons():
+            df = self.store.get(year)
+            self.nhl_model.get_index(year)
+            self.fantasy_model.engine.season_matrix(year, df)
+            self.nhl_model.get_cube(year)
+            self.fantasy_model.get_fantasy_cube(year, self.fantasy_model.f_scoring)
+        self.store.multi_season()
+        for rate in SimilarityIndex.rates:
+            self.nhl_model.get_similarity_index(rate)
+        self.record_preload_done()
+
+    def run(self, debug=True, **kwargs):
+        """
+        Runs the single process Dash development server, see wsgi.py for serving under load
+
+        Parameters:
+            debug (bool): Enables the reloader and Dash dev tools
+            kwargs: Passed on to dash.Dash.run (ie. host, port)
 
         Returns: None
         """
-        self.app.run_server(debug=True)
+        self.app.run(debug=debug, **kwargs)
 
 
-#Starts the application and provides the required data files for the server.
+#Starts the application, every skaters_XX.csv season file in the working directory is served
 if __name__ == '__main__':
-    files = ['skaters_24', 'skaters_23', 'skaters_22', 'skaters_21', 'skaters_20']
-    app = NHLApp(files)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(name)s %(levelname)s %(message)s')
+    app = NHLApp()
     app.run()
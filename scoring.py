@@ -0,0 +1,295 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ScoringEngine:
+    """
+    Scores fantasy stats from a contiguous matrix of each season's source stats
+
+    Each season's 12 source stat columns are copied once into an (players x stats) float matrix. Scoring a season
+    is then a single product of that matrix with the weight vector, rather than 12 separate column assignments.
+
+    Attributes:
+        labels (list): Fantasy scoring labels (ie. 'f_goal') in matrix column order
+        sources (list): Stat column scored by each label, in the same order
+        categories (list): Fantasy stat columns produced for each label, followed by the total column
+        matrices (dict): Season key -> cached stat matrix
+    """
+    def __init__(self, sources, categories):
+        """
+        Initialize the ScoringEngine
+
+        Parameters:
+        sources (dict): Fantasy scoring label -> stat column it multiplies (ie. 'f_goal' -> 'goals')
+        categories (list): Fantasy stat column names, one per label in the same order, then the total column
+        """
+        self.labels = list(sources.keys())
+        self.sources = list(sources.values())
+        self.categories = list(categories)
+        self.matrices = {}
+
+    def stat_matrix(self, df):
+        """
+        Copies the source stat columns of a data frame into a contiguous float matrix
+
+        Parameters:
+        df: A data frame containing the source stat columns
+
+        Returns:
+        np.ndarray: (players x stats) matrix, columns in label order
+        """
+        return np.ascontiguousarray(df[self.sources].to_numpy(dtype=np.float64))
+
+    def season_matrix(self, key, df):
+        """
+        Gets the stat matrix of a season, building it on first use
+
+        Parameters:
+        key (str): The season key (ie. '2024')
+        df: The season's data frame
+
+        Returns:
+        np.ndarray: The cached (players x stats) matrix of the season
+        """
+        matrix = self.matrices.get(key)
+        if matrix is None:
+            matrix = self.stat_matrix(df)
+            matrix.flags.writeable = False
+            self.matrices[key] = matrix
+        return matrix
+
+    def weights(self, scoring):
+        """
+        Converts a scoring dictionary to a weight vector
+
+        Parameters:
+        scoring (dict or np.ndarray): Fantasy scoring label -> value, or an already built weight vector
+
+        Returns:
+        np.ndarray: Weight of each label in matrix column order
+        """
+        if isinstance(scoring, np.ndarray):
+            return scoring
+        return np.array([float(scoring[label]) for label in self.labels], dtype=np.float64)
+
+    def score(self, matrix, scoring):
+        """
+        Scores every player of a stat matrix
+
+        Parameters:
+        matrix (np.ndarray): (players x stats) matrix from stat_matrix
+        scoring (dict or np.ndarray): Fantasy scoring label -> value, or a weight vector
+
+        Returns:
+        np.ndarray: (players x categories) matrix, the fantasy value of each stat then the total
+        """
+        values = np.empty((matrix.shape[0], len(self.categories)), dtype=np.float64)
+        np.multiply(matrix, self.weights(scoring), out=values[:, :-1])
+
+        #Summed left to right so totals are bit-identical to a pandas row sum of the category columns,
+        #a BLAS dot product can differ in the last place and reorder players with tied totals
+        values[:, -1] = np.add.accumulate(values[:, :-1], axis=1)[:, -1]
+        return values
+
+    def weight_matrix(self, scorings):
+        """
+        Stacks the weight vectors of several scorings as the columns of one matrix
+
+        Parameters:
+        scorings (list): Scoring dictionaries (fantasy scoring label -> value) or already built weight vectors
+
+        Returns:
+        np.ndarray: (stats x K) matrix, one column per scoring in the given order
+        """
+        weights = np.empty((len(self.labels), len(scorings)), dtype=np.float64)
+        for k, scoring in enumerate(scorings):
+            weights[:, k] = self.weights(scoring)
+        return weights
+
+    def score_totals(self, matrix, weights):
+        """
+        Scores the fantasy points total of every player under K scorings at once
+
+        The (players x stats) @ (stats x K) product, instead of K calls to score each writing every category.
+
+        Parameters:
+        matrix (np.ndarray): (players x stats) matrix from stat_matrix
+        weights (np.ndarray): (stats x K) matrix from weight_matrix
+
+        Returns:
+        np.ndarray: (players x K) matrix, each player's total under each scoring
+        """
+        #Accumulated one stat at a time, over every scoring at once, so each total is bit-identical to score's.
+        #A BLAS product sums in a different order and reorders players with tied totals
+        totals = np.multiply(matrix[:, :1], weights[:1])
+        product = np.empty_like(totals)
+        for j in range(1, matrix.shape[1]):
+            np.multiply(matrix[:, j:j + 1], weights[j:j + 1], out=product)
+            totals += product
+        return totals
+
+
+class ScoredSeason:
+    """
+    Read-only view of a season with derived (ie. fantasy) columns kept in a separate aligned array
+
+    The base season frame is shared between every request and is never written to. Derived values are looked up
+    by column name alongside the base columns, and only the rows being displayed are ever copied out.
+
+    Attributes:
+        base: The shared season data frame
+        columns (list): Names of the derived columns
+        values (np.ndarray or None): (players x derived columns) array aligned with the rows of base
+    """
+    def __init__(self, base, columns=(), values=None):
+        """
+        Initialize the ScoredSeason
+
+        Parameters:
+        base: The shared season data frame
+        columns (list): Names of the derived columns
+        values (np.ndarray or None): (players x derived columns) array aligned with the rows of base
+        """
+        self.base = base
+        self.columns = list(columns)
+        self.values = values
+        self.positions = {column: j for j, column in enumerate(self.columns)}
+
+    def __len__(self):
+        return len(self.base)
+
+    def column(self, name):
+        """
+        Gets the values of a derived or base column
+
+        Parameters:
+        name (str): The column name
+
+        Returns:
+        np.ndarray: The column's value for every player of the season
+        """
+        j = self.positions.get(name)
+        if j is not None:
+            return self.values[:, j]
+        return self.base[name].to_numpy()
+
+    def arrays(self, rows, columns):
+        """
+        Takes the given rows of derived and/or base columns as NumPy arrays, without building a data frame
+
+        Parameters:
+        rows (np.ndarray): Row positions to take, in display order
+        columns (list): Derived and/or base column names
+
+        Returns:
+        dict: Column name -> np.ndarray of the rows' values, text columns as object arrays
+        """
+        data = {}
+        for column in dict.fromkeys(columns):
+            j = self.positions.get(column)
+            if j is not None:
+                data[column] = self.values[rows, j]
+            else:
+                data[column] = np.asarray(self.base[column].array.take(rows))
+        return data
+
+
+class ScoredCache:
+    """
+    Bounded LRU cache of scored seasons keyed by (season, scoring vector)
+
+    Only changes to the fantasy scoring values need a rescore, every other UI interaction is served from here.
+
+    Attributes:
+        maxsize (int): Most scored seasons kept before the least recently used is evicted
+        hits (int): Lookups answered from the cache
+        misses (int): Lookups which had to score the season
+        evictions (int): Entries dropped to stay within maxsize
+    """
+    def __init__(self, maxsize=32):
+        """
+        Initialize the ScoredCache
+
+        Parameters:
+        maxsize (int): Most scored seasons kept before the least recently used is evicted
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(season, weights):
+        """
+        Builds the hashable cache key of a season and weight vector
+
+        Parameters:
+        season (str): The season key (ie. '2024')
+        weights (np.ndarray): Weight vector from ScoringEngine.weights
+
+        Returns:
+        tuple: (season, weights as a tuple of floats)
+        """
+        return season, tuple(weights.tolist())
+
+    def get(self, key, score):
+        """
+        Gets the scored values of a key, scoring and storing them on a miss
+
+        Parameters:
+        key (tuple): Key from ScoredCache.key
+        score (callable): Called with no arguments to score the season on a miss, returns the scored values
+
+        Returns:
+        np.ndarray: The read-only scored values
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        #Scored outside the lock, two threads missing on the same key both score it and the last one is kept
+        values = score()
+        values.flags.writeable = False
+        with self.lock:
+            self.entries[key] = values
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return values
+
+    def clear(self):
+        """
+        Drops every cached entry, counters are kept
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        """
+        Gets the cache counters
+
+        Returns:
+        dict: hits, misses, evictions, hit_rate, size and maxsize
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+            }
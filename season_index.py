@@ -0,0 +1,211 @@
+import numpy as np
+
+
+def rank_order(values):
+    """
+    Orders values from highest to lowest, ties keep their original order (same as DataFrame.nlargest)
+
+    Parameters:
+    values (np.ndarray): The values to order
+
+    Returns:
+    np.ndarray: Positions of the values, highest value first
+    """
+    #Negated as floats, small integer columns would overflow
+    return np.argsort(-values.astype(np.float64), kind='stable')
+
+
+def rank_columns(values):
+    """
+    Ranks the rows of each column from highest to lowest value, ties keep their original order like rank_order
+
+    Parameters:
+    values (np.ndarray): (rows x columns) matrix of values
+
+    Returns:
+    np.ndarray: (rows x columns) matrix of ranks, 1 for the highest value of each column
+    """
+    order = np.argsort(-values.astype(np.float64), axis=0, kind='stable')
+    ranks = np.empty(order.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.arange(1, len(values) + 1)[:, None], axis=0)
+    return ranks
+
+
+def top_n(values, rows, n):
+    """
+    Ranks the given rows by value and keeps the top n, ties keep their original order (same as DataFrame.nlargest)
+
+    When n is small only the top n are sorted, the rest are split off with a linear time partition.
+
+    Parameters:
+    values (np.ndarray): The ranking value of each row in rows
+    rows (np.ndarray): Row positions being ranked
+    n (int): Number of rows to keep
+
+    Returns:
+    np.ndarray: Row positions of the top n rows, highest value first
+    """
+    if n <= 0:
+        return rows[:0]
+    if n * 4 >= len(values):
+        return rows[rank_order(values)[:n]]
+
+    #The n-th largest value, every larger value is in, ties with it are taken in original order
+    threshold = -np.partition(-values.astype(np.float64), n - 1)[n - 1]
+    picked = np.flatnonzero(values > threshold)
+    ties = np.flatnonzero(values == threshold)[:n - len(picked)]
+    picked = np.sort(np.concatenate([picked, ties]))
+    return rows[picked[rank_order(values[picked])]]
+
+
+class SeasonIndex:
+    """
+    Pre-built row masks of a season for each team and position, and the rank order of each stat
+
+    Team and position filters are answered by OR-ing the selected masks together and AND-ing the two results,
+    instead of running isin over the whole season on every request. Top-N queries on a ranked stat are a slice
+    of its rank order rather than a partial sort.
+
+    Attributes:
+        size (int): Number of players (rows) in the season
+        team_masks (dict): Team -> boolean mask of the team's rows
+        position_masks (dict): Position -> boolean mask of the position's rows
+        orders (dict): Stat -> row positions from the highest to the lowest value
+    """
+
+    #Below this share of the season selected, sorting the selected rows beats walking the full rank order
+    sort_selected_ratio = 0.25
+
+    def __init__(self, df, stats=()):
+        """
+        Initialize the SeasonIndex and build the masks and rank orders
+
+        Parameters:
+        df: The season's data frame
+        stats (list): Stat columns to build rank orders for
+        """
+        self.size = len(df)
+        self.team_masks = self.build_masks(df['team'])
+        self.position_masks = self.build_masks(df['position'])
+        self.all_rows = np.arange(self.size)
+        self.all_rows.flags.writeable = False
+
+        self.values = {}
+        self.orders = {}
+        for stat in stats:
+            values = df[stat].to_numpy()
+            order = rank_order(values).astype(np.int32)
+            order.flags.writeable = False
+            self.values[stat] = values
+            self.orders[stat] = order
+
+    @staticmethod
+    def build_masks(column):
+        """
+        Builds one boolean mask per distinct value of a column
+
+        Parameters:
+        column (pd.Series): A categorical or text column
+
+        Returns:
+        dict: Value -> read-only boolean mask of the rows holding the value
+        """
+        categorical = column.astype('category')
+        codes = categorical.cat.codes.to_numpy()
+        masks = {}
+        for code, value in enumerate(categorical.cat.categories):
+            mask = codes == code
+            mask.flags.writeable = False
+            masks[value] = mask
+        return masks
+
+    def combine(self, masks, selected):
+        """
+        ORs together the masks of the selected values
+
+        Parameters:
+        masks (dict): Value -> boolean mask
+        selected (list): Selected values, ones missing from the season match no rows
+
+        Returns:
+        np.ndarray: Boolean mask of the rows holding any selected value
+        """
+        combined = np.zeros(self.size, dtype=bool)
+        for value in selected:
+            mask = masks.get(value)
+            if mask is not None:
+                combined |= mask
+        return combined
+
+    def mask(self, teams=None, positions=None):
+        """
+        Gets the mask of the rows matching the team and position filters
+
+        Parameters:
+        teams (list or None): Selected team(s), None or empty for all teams
+        positions (list or None): Selected position(s), None or empty for all positions
+
+        Returns:
+        np.ndarray or None: Boolean mask of the matching rows, None when nothing is filtered
+        """
+        if not teams and not positions:
+            return None
+        if not positions:
+            return self.combine(self.team_masks, teams)
+        if not teams:
+            return self.combine(self.position_masks, positions)
+        return self.combine(self.team_masks, teams) & self.combine(self.position_masks, positions)
+
+    def rows(self, teams=None, positions=None):
+        """
+        Gets the positions of the rows matching the team and position filters
+
+        Parameters:
+        teams (list or None): Selected team(s), None or empty for all teams
+        positions (list or None): Selected position(s), None or empty for all positions
+
+        Returns:
+        np.ndarray: Row positions of the matching players in season order
+        """
+        mask = self.mask(teams, positions)
+        if mask is None:
+            return self.all_rows
+        return np.flatnonzero(mask)
+
+    def top(self, stat, n, teams=None, positions=None):
+        """
+        Gets the top n rows of a ranked stat matching the team and position filters
+
+        Parameters:
+        stat (str): A stat with a rank order
+        n (int): Number of rows to keep
+        teams (list or None): Selected team(s), None or empty for all teams
+        positions (list or None): Selected position(s), None or empty for all positions
+
+        Returns:
+        np.ndarray: Row positions of the top n matching rows, highest value first
+        """
+        return self.top_masked(stat, n, self.mask(teams, positions))
+
+    def top_masked(self, stat, n, mask):
+        """
+        Gets the top n rows of a ranked stat within a mask
+
+        Parameters:
+        stat (str): A stat with a rank order
+        n (int): Number of rows to keep
+        mask (np.ndarray or None): Boolean mask of the selected rows from mask, None for every row
+
+        Returns:
+        np.ndarray: Row positions of the top n selected rows, highest value first
+        """
+        order = self.orders[stat]
+        if mask is None:
+            return order[:n]
+
+        #Few rows selected, rank just those rows
+        rows = np.flatnonzero(mask)
+        if len(rows) < self.size * self.sort_selected_ratio:
+            return top_n(self.values[stat][rows], rows, n)
+
+        return order[mask[order]][:n]
@@ -0,0 +1,397 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from derived_stats import derived_columns
+from multi_season import MultiSeasonTable
+
+#pyarrow is optional, without it snapshots are written as pickles which can't be memory-mapped
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+
+class SnapshotCache:
+    """
+    Keeps a typed binary snapshot of each compacted season file so later starts skip the CSV parse
+
+    Snapshots are Feather (Arrow IPC) files memory-mapped on load: numeric columns are read-only views of the
+    mapped file (one pandas block per column), only the categorical columns are built in process memory. Each
+    snapshot has a small JSON manifest recording the CSV's mtime, size and hash, the snapshot is only rebuilt when
+    the CSV has changed.
+    """
+
+    #Bump when the compact representation changes so old snapshots are rebuilt
+    version = 2
+
+    def __init__(self, cache_dir='.season_cache'):
+        """
+        Initialize the SnapshotCache
+
+        Parameters:
+        cache_dir (str): Directory holding the snapshots and manifests, created if missing
+        """
+        self.cache_dir = cache_dir
+        self.extension = 'feather' if feather is not None else 'pkl'
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def paths(self, file):
+        """
+        Gets the snapshot and manifest paths of a season file
+
+        Parameters:
+        file (str): The CSV file name without the '.csv' extension
+
+        Returns:
+        tuple: (snapshot path, manifest path)
+        """
+        base = os.path.join(self.cache_dir, os.path.basename(file))
+        return f'{base}.{self.extension}', f'{base}.json'
+
+    def load(self, file, convert):
+        """
+        Gets the compact data frame of a season file, from its snapshot when still valid
+
+        Parameters:
+        file (str): The CSV file name without the '.csv' extension
+        convert (callable): Called with no arguments to parse + compact the CSV when the snapshot is stale
+
+        Returns:
+        The compact data frame of the season
+        """
+        csv_path = f'{file}.csv'
+        snapshot_path, manifest_path = self.paths(file)
+        csv_stat = os.stat(csv_path)
+        manifest = self.read_manifest(manifest_path)
+
+        if manifest is not None and os.path.exists(snapshot_path):
+            #Same mtime and size, trust the snapshot without reading the CSV
+            if manifest['mtime_ns'] == csv_stat.st_mtime_ns and manifest['size'] == csv_stat.st_size:
+                return self.read_snapshot(snapshot_path)
+
+            #Touched but unchanged (ie. a fresh checkout), refresh the manifest and keep the snapshot
+            digest = self.hash_file(csv_path)
+            if manifest['sha256'] == digest:
+                self.write_manifest(manifest_path, csv_stat, digest)
+                return self.read_snapshot(snapshot_path)
+        else:
+            digest = self.hash_file(csv_path)
+
+        df = convert()
+        self.write_snapshot(snapshot_path, df)
+        self.write_manifest(manifest_path, csv_stat, digest)
+        return df
+
+    def read_manifest(self, manifest_path):
+        """
+        Reads a snapshot manifest
+
+        Parameters:
+        manifest_path (str): Path of the manifest
+
+        Returns:
+        dict or None: The manifest, None when missing, unreadable or written by another cache version
+        """
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('version') != self.version:
+            return None
+        return manifest
+
+    def write_manifest(self, manifest_path, csv_stat, digest):
+        """
+        Records the state of the CSV the snapshot was built from
+
+        Parameters:
+        manifest_path (str): Path of the manifest
+        csv_stat (os.stat_result): Stat of the CSV file
+        digest (str): sha256 hex digest of the CSV file
+
+        Returns:
+            None
+        """
+        manifest = {
+            'version': self.version,
+            'mtime_ns': csv_stat.st_mtime_ns,
+            'size': csv_stat.st_size,
+            'sha256': digest,
+        }
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+
+    def read_snapshot(self, snapshot_path):
+        """
+        Reads a snapshot, memory-mapping it when stored as Feather. Numeric columns stay zero-copy views of the
+        mapping, consolidating them into one block per dtype would copy them into process memory.
+
+        Parameters:
+        snapshot_path (str): Path of the snapshot
+
+        Returns:
+        The compact data frame stored in the snapshot
+        """
+        if feather is not None:
+            return feather.read_table(snapshot_path, memory_map=True).to_pandas(split_blocks=True, self_destruct=True)
+        with open(snapshot_path, 'rb') as f:
+            return pickle.load(f)
+
+    def write_snapshot(self, snapshot_path, df):
+        """
+        Writes a snapshot, uncompressed so it can be memory-mapped
+
+        Parameters:
+        snapshot_path (str): Path of the snapshot
+        df: The compact data frame to store
+
+        Returns:
+            None
+        """
+        #Write to a temporary file first so another worker never reads a half written snapshot
+        tmp_path = f'{snapshot_path}.{os.getpid()}.tmp'
+        if feather is not None:
+            feather.write_feather(df, tmp_path, compression='uncompressed')
+        else:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+
+    @staticmethod
+    def hash_file(path):
+        """
+        Gets the sha256 digest of a file
+
+        Parameters:
+        path (str): Path of the file
+
+        Returns:
+        str: The hex digest
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+
+class SeasonStore:
+    """
+    Registry of the season files, each season is loaded into a compact columnar form the first time it is
+    requested and then shared by NHLModel and FantasyModel
+
+    Seasons are keyed by the year the season ends in (the 2023-2024 season is '2024'), taken from each file's
+    name or 'season' column. Adding a season is adding its skaters_XX.csv file to the data directory.
+
+    Attributes:
+        files (dict): Season key -> CSV file name (without the '.csv' extension), newest season first
+        cache (SnapshotCache or None): Binary snapshot cache of the compacted files
+        load_times (dict): Season key -> Seconds spent parsing + compacting (or reading the snapshot of) the file
+    """
+
+    #Text columns with few distinct values, stored as pandas categoricals
+    category_columns = ['name', 'team', 'position']
+
+    #Season files discovered in the data directory
+    file_pattern = 'skaters_*.csv'
+
+    def __init__(self, files=None, cache=None, data_dir='.'):
+        """
+        Initialize the SeasonStore, finding each file's season without loading any of them
+
+        Parameters:
+        files (list or None): A list of CSV file names containing nhl player data
+                              Does NOT contain the '.csv' extension
+                              When None every file matching file_pattern in data_dir is used
+        cache (SnapshotCache or None): Binary snapshot cache used instead of parsing the CSVs when valid
+        data_dir (str): Directory searched for season files when files is None
+        """
+        if files is None:
+            files = [path[:-len('.csv')] for path in glob.glob(os.path.join(data_dir, self.file_pattern))]
+
+        seasons = {self.season_key(file): file for file in files}
+        self.files = dict(sorted(seasons.items(), reverse=True))
+        self.cache = cache
+        self.load_times = {}
+        self.loaded = {}
+        self.lock = threading.Lock()
+        self.season_locks = {key: threading.Lock() for key in self.files}
+        self.multi = None
+        self.multi_lock = threading.Lock()
+
+    @staticmethod
+    def season_key(file):
+        """
+        Gets the season of a file from its name (skaters_24 -> '2024'), or from the 'season' column of its
+        first row when the name doesn't follow that pattern
+
+        Parameters:
+        file (str): The CSV file name without the '.csv' extension
+
+        Returns:
+        str: The year the season ends in (ie. '2024' for the 2023-2024 season)
+        """
+        match = re.fullmatch(r'skaters_(\d{2})', os.path.basename(file))
+        if match:
+            return f'20{match.group(1)}'
+
+        season = pd.read_csv(f'{file}.csv', usecols=['season'], nrows=1)['season'].iloc[0]
+        return str(int(season) + 1)
+
+    def seasons(self):
+        """
+        Gets the season keys of the registry
+
+        Returns:
+        list: Season keys, newest first
+        """
+        return list(self.files)
+
+    def get(self, key):
+        """
+        Gets the compact data frame of a season, loading it on first request
+
+        Parameters:
+        key (str): The season key (ie. '2024')
+
+        Returns:
+        The season's data frame, None for an unknown season
+        """
+        df = self.loaded.get(key)
+        if df is not None or key not in self.files:
+            return df
+
+        #Only requests for this season wait while it loads
+        with self.season_locks[key]:
+            df = self.loaded.get(key)
+            if df is None:
+                df = self.load(key)
+                with self.lock:
+                    self.loaded[key] = df
+        return df
+
+    def preload(self, keys=None, max_workers=2):
+        """
+        Loads seasons on a background thread pool, requests for a season still loading wait only for that season
+
+        Parameters:
+        keys (list or None): Season keys to load, None for every season not loaded yet
+        max_workers (int): Number of loader threads
+
+        Returns:
+        list: A future per season, each resolving to the season's data frame
+        """
+        if keys is None:
+            keys = [key for key in self.files if key not in self.loaded]
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='season-preload')
+        futures = [executor.submit(self.get, key) for key in keys]
+        executor.shutdown(wait=False)
+        return futures
+
+    @property
+    def frames(self):
+        """
+        Gets the data frame of every season, loading any not loaded yet
+
+        Returns:
+        list: The compact data frame of each season, newest first
+        """
+        return [self.get(key) for key in self.files]
+
+    def load(self, key):
+        """
+        Reads a single season file and converts it to the compact representation
+
+        Parameters:
+        key (str): The season key
+
+        Returns:
+        The compact data frame of the season
+        """
+        file = self.files[key]
+        start = time.perf_counter()
+        if self.cache is not None:
+            df = self.cache.load(file, lambda: self.compact(pd.read_csv(f'{file}.csv')))
+        else:
+            df = self.compact(pd.read_csv(f'{file}.csv'))
+        self.load_times[key] = time.perf_counter() - start
+        return df
+
+    def compact(self, df):
+        """
+        Converts the text columns to categoricals and downcasts the integer stat columns to the smallest dtype
+        able to hold their values, then appends the derived per game, per 60 minute and percentile columns
+        (see derived_stats) so they are computed once per season and kept in its snapshot
+
+        Parameters:
+        df: The data frame as parsed from the CSV file
+
+        Returns:
+        df: The compact data frame
+        """
+        for column in self.category_columns:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+
+        for column in df.select_dtypes(include='integer').columns:
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+
+        #Added in one concat, column by column inserts fragment the frame
+        return pd.concat([df, pd.DataFrame(derived_columns(df), index=df.index)], axis=1)
+
+    def multi_season(self):
+        """
+        Gets the long table of every season, built on first use and shared by every model
+
+        Returns:
+        MultiSeasonTable: All seasons in one playerid-sorted table
+        """
+        with self.multi_lock:
+            if self.multi is None:
+                self.multi = MultiSeasonTable(self.frames)
+            return self.multi
+
+    def memory_usage(self):
+        """
+        Gets the resident memory used by each loaded season frame
+
+        Returns:
+        dict: Season key -> Bytes used by the season's data frame
+        """
+        with self.lock:
+            loaded = dict(self.loaded)
+        return {key: int(df.memory_usage(deep=True).sum()) for key, df in loaded.items()}
+
+    def stats(self):
+        """
+        Gets the memory and load-time stats of the store, used to confirm the savings in each worker process
+
+        Returns:
+        dict: Per-season rows, bytes and load seconds of the loaded seasons, the totals for the whole store
+              and the seasons not loaded yet
+        """
+        memory = self.memory_usage()
+        seasons = {
+            key: {
+                'rows': len(self.loaded[key]),
+                'memory_bytes': memory[key],
+                'load_seconds': round(self.load_times[key], 4),
+            }
+            for key in memory
+        }
+        return {
+            'seasons': seasons,
+            'not_loaded': [key for key in self.files if key not in memory],
+            'total_memory_bytes': sum(memory.values()),
+            'total_load_seconds': round(sum(self.load_times[key] for key in memory), 4),
+        }
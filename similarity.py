@@ -0,0 +1,169 @@
+import numpy as np
+
+from season_index import SeasonIndex
+
+
+class SimilarityIndex:
+    """
+    Nearest neighbour search over the stat vectors of every season of every player
+
+    Each row of the multi-season table (one player's season) becomes a vector of its stat rates, per game played
+    or per 60 minutes played, z-scored within its season so players of different seasons are compared on where
+    they stood among that season's players. The vectors and their squared norms are computed once, a query of any
+    number of players is then a single matrix product: |q - x|^2 = |q|^2 - 2 q.x + |x|^2.
+
+    Attributes:
+        rate (str): 'per_game' or 'per_60'
+        stats (list): Stat columns in the vectors
+        years (np.ndarray): Season end year of each row
+        playerids (np.ndarray): Player id of each row, sorted (each player's seasons are contiguous, oldest first)
+        games (np.ndarray): Games played of each row
+        info: Data frame of each row's name, team and position
+        vectors (np.ndarray): (rows x stats) z-scored rates
+        norms (np.ndarray): Squared norm of each vector
+    """
+
+    #Denominator of each rate and what it is multiplied by
+    rates = {'per_game': ('games_played', 1.0), 'per_60': ('mins_played', 60.0)}
+
+    def __init__(self, table, stats, rate='per_game'):
+        """
+        Initialize the SimilarityIndex and build the vectors
+
+        Parameters:
+        table (MultiSeasonTable): Every season of every player
+        stats (list): Stat columns to compare players on, ones missing from the table are left out
+        rate (str): 'per_game' or 'per_60'
+        """
+        if rate not in self.rates:
+            raise ValueError(f'Unknown similarity rate: {rate}')
+        self.rate = rate
+        self.stats = [stat for stat in stats if stat in table.columns]
+        self.years = table.years
+        self.playerids = table.playerids
+        self.games = table.matrix[:, table.columns.index('games_played')]
+        self.info = table.info
+
+        #Rates of every stat, 0 for a row without games/minutes
+        column, scale = self.rates[rate]
+        denominator = table.matrix[:, [table.columns.index(column)]]
+        values = table.matrix[:, [table.columns.index(stat) for stat in self.stats]]
+        rates = np.divide(values * scale, denominator, out=np.zeros_like(values), where=denominator > 0)
+
+        #Standardized within each season, a stat nobody recorded in a season stays 0
+        self.vectors = np.empty_like(rates)
+        for year in np.unique(self.years):
+            season = self.years == year
+            mean = rates[season].mean(axis=0)
+            std = rates[season].std(axis=0)
+            self.vectors[season] = (rates[season] - mean) / np.where(std > 0, std, 1.0)
+        self.vectors.flags.writeable = False
+        self.norms = np.einsum('ij,ij->i', self.vectors, self.vectors)
+
+        self.team_masks = SeasonIndex.build_masks(self.info['team'])
+        self.position_masks = SeasonIndex.build_masks(self.info['position'])
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def player_row(self, playerid, year=None):
+        """
+        Gets the row of a player's season
+
+        Parameters:
+        playerid (int): The player's id
+        year (int or None): The season end year, None for the player's latest season
+
+        Returns:
+        int or None: The row, None when the player didn't play that season
+        """
+        start, stop = np.searchsorted(self.playerids, [playerid, playerid + 1])
+        if start == stop:
+            return None
+        if year is None:
+            return int(stop - 1)
+        rows = start + np.flatnonzero(self.years[start:stop] == int(year))
+        return int(rows[0]) if len(rows) else None
+
+    def candidates(self, teams=None, positions=None, years=None, min_games=0):
+        """
+        Gets the rows that can be returned as neighbours
+
+        Parameters:
+        teams (list or None): Selected team(s), None or empty for all teams
+        positions (list or None): Selected position(s), None or empty for all positions
+        years (list or None): Season end years to search, None or empty for every season
+        min_games (int): Fewest games played of a returned season, rates of a few games are mostly noise
+
+        Returns:
+        np.ndarray: The candidate rows in table order
+        """
+        mask = self.games >= min_games
+        for masks, selected in ((self.team_masks, teams), (self.position_masks, positions)):
+            if selected:
+                combined = np.zeros(len(mask), dtype=bool)
+                for value in selected:
+                    if value in masks:
+                        combined |= masks[value]
+                mask &= combined
+        if years:
+            mask &= np.isin(self.years, [int(year) for year in years])
+        return np.flatnonzero(mask)
+
+    def query(self, rows, k=10, teams=None, positions=None, years=None, min_games=0):
+        """
+        Finds the k nearest seasons of other players for each queried row, in one batched distance computation
+
+        Parameters:
+        rows (list): Rows of the queried players' seasons (see player_row)
+        k (int): Neighbours to return per queried row
+        teams, positions, years, min_games: Filters of the neighbours, see candidates
+
+        Returns:
+        list: One (rows, distances) pair of arrays per queried row, nearest first. Seasons of the queried player
+              are never returned, fewer than k are returned when the filters leave fewer.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        candidates = self.candidates(teams, positions, years, min_games)
+        k = min(k, len(candidates))
+        if k <= 0:
+            return [(candidates[:0], np.zeros(0)) for _ in rows]
+
+        #(queries x candidates) squared distances, clipped as rounding can make a near-zero distance negative
+        distances = self.norms[rows][:, None] - 2.0 * (self.vectors[rows] @ self.vectors[candidates].T) \
+            + self.norms[candidates][None, :]
+        np.maximum(distances, 0.0, out=distances)
+        distances[self.playerids[rows][:, None] == self.playerids[candidates][None, :]] = np.inf
+
+        #Partitioned to the k smallest of each query, then only those are sorted
+        if k < len(candidates):
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(len(candidates)), (len(rows), len(candidates)))
+
+        results = []
+        for i in range(len(rows)):
+            picked = np.sort(nearest[i])
+            picked = picked[np.argsort(distances[i, picked], kind='stable')]
+            picked = picked[np.isfinite(distances[i, picked])]
+            results.append((candidates[picked], np.sqrt(distances[i, picked])))
+        return results
+
+    def frame(self, rows, distances):
+        """
+        Builds a data frame describing neighbour rows
+
+        Parameters:
+        rows (np.ndarray): Rows from query
+        distances (np.ndarray): Their distances from query
+
+        Returns:
+        Data frame of each row's playerid, year (the season end year, unlike the data's 'season' start year), name,
+        team, position, games played and distance
+        """
+        df = self.info.iloc[rows].reset_index(drop=True)
+        df.insert(0, 'playerid', self.playerids[rows])
+        df.insert(1, 'year', self.years[rows])
+        df['games_played'] = self.games[rows].astype(np.int64)
+        df['distance'] = distances
+        return df
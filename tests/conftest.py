@@ -0,0 +1,7 @@
+import os
+import sys
+
+#Tests are run from the repo root (python -m pytest), make the app modules importable under any runner
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
@@ -0,0 +1,38 @@
+import threading
+import time
+
+from coalesce import RequestCoalescer
+
+
+def test_superseded_request_returns_before_its_window():
+    coalescer = RequestCoalescer(window=2)
+    results = {}
+
+    def older():
+        start = time.perf_counter()
+        results['older'] = coalescer.settle('session'), time.perf_counter() - start
+
+    thread = threading.Thread(target=older)
+    thread.start()
+    time.sleep(0.05)
+    coalescer.window = 0.05
+    assert coalescer.settle('session')
+    thread.join()
+
+    settled, waited = results['older']
+    assert not settled
+    assert waited < 1
+    assert coalescer.stats()['settled'] == 1
+    assert coalescer.stats()['coalesced'] == 1
+    assert coalescer.stats()['waiting_sessions'] == 0
+
+
+def test_sessions_do_not_supersede_each_other():
+    coalescer = RequestCoalescer(window=0.05)
+    results = []
+    threads = [threading.Thread(target=lambda s=s: results.append(coalescer.settle(s))) for s in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [True, True]
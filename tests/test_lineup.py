@@ -0,0 +1,58 @@
+import numpy as np
+
+from lineup import LineupOptimizer
+
+SLOTS = {
+    'C': (1, ('C',)),
+    'W': (1, ('L', 'R')),
+    'D': (2, ('D',)),
+    'UTIL': (1, ('C', 'L', 'R', 'D')),
+}
+
+
+def solve(values, positions, teams, team_cap=None):
+    picked, slots = LineupOptimizer(SLOTS, team_cap).solve(np.array(values, dtype=np.float64), np.array(positions),
+                                                           np.array(teams))
+    return dict(zip(slots, [picked[np.array(slots) == slot].tolist() for slot in slots]))
+
+
+def test_position_slots_take_the_best_of_each_position():
+    #0-1 C, 2-3 L, 4 R, 5-7 D
+    values = [10, 8, 9, 3, 5, 7, 6, 2]
+    positions = ['C', 'C', 'L', 'L', 'R', 'D', 'D', 'D']
+    lineup = solve(values, positions, ['TOR'] * 8)
+    assert lineup['C'] == [0]
+    assert lineup['W'] == [2]
+    assert lineup['D'] == [5, 6]
+    assert lineup['UTIL'] == [1]
+
+
+def test_flex_slot_goes_to_the_best_player_left_of_any_position():
+    #The third defenceman beats the second centre and the second winger for the utility slot
+    values = [10, 4, 9, 3, 7, 6, 5]
+    positions = ['C', 'C', 'L', 'R', 'D', 'D', 'D']
+    lineup = solve(values, positions, ['TOR'] * 7)
+    assert lineup['D'] == [4, 5]
+    assert lineup['UTIL'] == [6]
+
+
+def test_flex_assignment_moves_players_to_fill_position_slots():
+    #Only wingers and one centre: a winger has to take the utility slot, the centre keeps its own slot
+    values = [1, 9, 8, 7]
+    positions = ['C', 'L', 'R', 'L']
+    lineup = solve(values, positions, ['TOR'] * 4)
+    assert lineup['C'] == [0]
+    assert lineup['W'] == [1]
+    assert lineup['UTIL'] == [2]
+    assert 'D' not in lineup
+
+
+def test_team_cap_is_respected():
+    values = [10, 9, 8, 7, 6, 5, 4, 3]
+    positions = ['C', 'L', 'D', 'D', 'C', 'R', 'D', 'D']
+    teams = ['TOR', 'TOR', 'TOR', 'MTL', 'MTL', 'MTL', 'BOS', 'BOS']
+    lineup = solve(values, positions, teams, team_cap=2)
+    picked = [i for rows in lineup.values() for i in rows]
+    assert len(picked) == 5
+    assert max(sum(teams[i] == team for i in picked) for team in set(teams)) <= 2
+    assert sum(values[i] for i in picked) == 10 + 9 + 7 + 6 + 4
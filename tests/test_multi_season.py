@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from multi_season import MultiSeasonTable
+from season_store import SeasonStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FILES = [os.path.join(ROOT, name) for name in ['skaters_24', 'skaters_23', 'skaters_22', 'skaters_21', 'skaters_20']]
+
+
+def season(year, goals, assists, games):
+    return pd.DataFrame({
+        'playerid': [1, 2],
+        'season': [year - 1, year - 1],
+        'name': ['A', 'B'],
+        'team': ['TOR', 'MTL'],
+        'position': ['C', 'D'],
+        'goals': goals,
+        'assists': assists,
+        'points': [g + a for g, a in zip(goals, assists)],
+        'games_played': games,
+        'mins_played': [g * 15 for g in games],
+    })
+
+
+def test_rolling_window_takes_every_column_from_one_window():
+    #Player 1's goals peak in 2021-2022, assists and points in 2023-2024
+    table = MultiSeasonTable([
+        season(2021, [30, 1], [5, 2], [80, 10]),
+        season(2022, [30, 1], [5, 2], [80, 10]),
+        season(2023, [5, 1], [40, 2], [60, 10]),
+        season(2024, [5, 1], [40, 2], [60, 10]),
+    ])
+    df = table.range_frame(2021, 2024, 'rolling_2').set_index('playerid')
+    assert df.loc[1, ['goals', 'assists', 'points', 'games_played']].tolist() == [10, 80, 90, 120]
+    assert df.loc[2, ['goals', 'assists', 'points', 'games_played']].tolist() == [2, 4, 6, 20]
+
+
+def test_rolling_points_are_goals_plus_assists_on_shipped_data():
+    table = SeasonStore(FILES).multi_season()
+    for mode in ('rolling_2', 'rolling_3'):
+        df = table.range_frame(2020, 2024, mode)
+        np.testing.assert_array_equal(df['points'], df['goals'] + df['assists'])
@@ -0,0 +1,26 @@
+import numpy as np
+
+from scoring import ScoringEngine
+
+SOURCES = {
+    'f_goal': 'goals',
+    'f_assist': 'assists',
+    'f_sog': 'shots_on_goal',
+    'f_hit': 'hits',
+    'f_giveaway': 'giveaways',
+}
+CATEGORIES = ['f_goals', 'f_assists', 'f_sogs', 'f_hits', 'f_giveaways', 'f_points']
+
+
+def random_matrix(rng, players=500):
+    return rng.integers(0, 300, size=(players, len(SOURCES))).astype(np.float64)
+
+
+def test_score_totals_match_score():
+    rng = np.random.default_rng(1)
+    engine = ScoringEngine(SOURCES, CATEGORIES)
+    matrix = random_matrix(rng)
+    scorings = [rng.normal(size=len(SOURCES)).round(2) for _ in range(4)]
+    totals = engine.score_totals(matrix, engine.weight_matrix(scorings))
+    for k, weights in enumerate(scorings):
+        np.testing.assert_array_equal(totals[:, k], engine.score(matrix, weights)[:, -1])
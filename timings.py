@@ -0,0 +1,167 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """
+    Latency histogram with fixed, doubling bucket bounds from 0.05 ms to about 6.5 s
+
+    Recording is a bisect and a few additions, quantiles are read from the buckets (the upper bound of the bucket
+    holding the quantile), precise to within a factor of 2.
+
+    Attributes:
+        counts (list): Number of samples in each bucket, the last bucket holds everything above the largest bound
+        count (int): Number of samples
+        total (float): Sum of the samples in seconds
+        max (float): Largest sample in seconds
+    """
+
+    #Bucket upper bounds in seconds
+    bounds = tuple(0.00005 * 2 ** i for i in range(18))
+
+    def __init__(self):
+        """
+        Initialize an empty Histogram
+        """
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        """
+        Adds a sample
+
+        Parameters:
+        seconds (float): The sample
+
+        Returns:
+            None
+        """
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        """
+        Gets a quantile of the samples
+
+        Parameters:
+        q (float): The quantile (0-1)
+
+        Returns:
+        float: Upper bound in seconds of the bucket holding the quantile, the largest sample when above every bound
+        """
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        """
+        Summarizes the histogram
+
+        Returns:
+        dict: count, mean, p50, p95, p99 and max in milliseconds plus [bucket upper bound in ms, cumulative count]
+              pairs, ordered from the smallest bound
+        """
+        summary = {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 4) if self.count else 0.0,
+        }
+        for name, q in (('p50_ms', 0.5), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+            summary[name] = round(self.quantile(q) * 1000, 4)
+        summary['max_ms'] = round(self.max * 1000, 4)
+
+        #Cumulative like a Prometheus histogram, the buckets above the largest sample are left out
+        buckets = []
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            buckets.append([f'{bound * 1000:g}', seen])
+            if seen == self.count:
+                break
+        buckets.append(['+Inf', self.count])
+        summary['buckets_ms'] = buckets
+        return summary
+
+
+class Timings:
+    """
+    Per-stage latency histograms of the callbacks (season fetch, scoring, filtering, ranking, figure build...)
+
+    Stages are timed with the stage context manager. The histograms are exported as JSON (served under /metrics)
+    and a one line summary of each stage is logged every log_every samples.
+
+    Attributes:
+        histograms (dict): Stage name -> Histogram
+        samples (int): Samples recorded over every stage
+    """
+
+    #A summary of every stage is logged each time this many samples were recorded
+    log_every = 1000
+
+    def __init__(self):
+        """
+        Initialize the Timings without any stage
+        """
+        self.histograms = {}
+        self.samples = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Times the body of a with block as a stage
+
+        Parameters:
+        name (str): The stage name (ie. 'figure')
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        """
+        Adds a sample to a stage's histogram
+
+        Parameters:
+        name (str): The stage name
+        seconds (float): Time spent in the stage
+
+        Returns:
+            None
+        """
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+            self.samples += 1
+            if self.samples % self.log_every:
+                return
+            lines = [f'{stage}: n={hist.count} mean {hist.total / hist.count * 1000:.2f} ms '
+                     f'p95 {hist.quantile(0.95) * 1000:.2f} ms' for stage, hist in sorted(self.histograms.items())]
+        logger.info('Stage timings: %s', ', '.join(lines))
+
+    def summary(self):
+        """
+        Gets the summary of every stage's histogram
+
+        Returns:
+        dict: Stage name -> Histogram.summary
+        """
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
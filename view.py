@@ -1,10 +1,16 @@
+import uuid
+
 import dash
 from dash import dcc
 from dash import html
 
 
 class NHLView:
-    def __init__(self, nhl_model, fantasy_model):
+
+    #Seconds a fantasy scoring input waits after the last keystroke before sending its value
+    debounce_seconds = 0.5
+
+    def __init__(self, nhl_model, fantasy_model, scoring_update='debounce'):
         """
         Initializes the NHLView class which creates the Dash application layout
 
@@ -16,9 +22,14 @@ class NHLView:
             Model containing real NHL player statistics + team information
         fantasy_model: FantasyModel
             Model containing fantasy scoring data sets and scoring settings
+        scoring_update: str
+            When edited fantasy scoring values are applied
+            'debounce': Once typing in a scoring input has paused for debounce_seconds
+            'apply': When the "Apply Scoring" button is clicked
         """
         self.nhl_model = nhl_model
         self.fantasy_model = fantasy_model
+        self.scoring_update = scoring_update
         self.layout = self.create_layout()
 
     def create_layout(self):
@@ -29,6 +40,12 @@ class NHLView:
         Returns:
             html.Div: A Dash Html Div component that contains the application's layout
         """
+        #Seasons selectable in a season range
+        years = self.nhl_model.season_years()
+
+        #Scoring inputs only send their value once typing pauses, or never when applied with the button
+        debounce = self.debounce_seconds if self.scoring_update == 'debounce' else True
+
         return html.Div([
             # Header
             html.H1("NHL Player Statistics", style={'text-align': 'center'}),
@@ -55,18 +72,37 @@ class NHLView:
                          children=[
                              html.H5("Select Year", style={'margin-top': '1px'}),
                              dcc.Dropdown(id="select_year",
-                                          options=[
-                                              {"label": "2023-2024", "value": '2024'},
-                                              {"label": "2022-2023", "value": '2023'},
-                                              {"label": "2021-2022", "value": '2022'},
-                                              {"label": "2020-2021", "value": '2021'},
-                                              {"label": "2019-2020", "value": '2020'},
+                                          options=self.nhl_model.season_options()
+                                          + [{"label": "Seasons: range", "value": 'range'}],
+                                          multi=False,
+                                          value=self.nhl_model.store.seasons()[0],
+                                          ),
+                         ], style={'width': "20%", 'display': 'inline-block'}
+                         ),
 
+                #Range of seasons + how they are combined, shown when "Seasons: range" is selected
+                html.Div(id="season_range_block",
+                         children=[
+                             html.H5("Select Seasons", style={'margin-top': '1px'}),
+                             dcc.RangeSlider(id="select_seasons",
+                                             min=years[0],
+                                             max=years[-1],
+                                             step=1,
+                                             value=[years[0], years[-1]],
+                                             marks={year: f'{year - 1}-{str(year)[2:]}' for year in years},
+                                             ),
+                             dcc.Dropdown(id="select_season_mode",
+                                          options=[
+                                              {"label": "Pooled Totals", "value": 'total'},
+                                              {"label": "Per Game", "value": 'per_game'},
+                                              {"label": "Best 2 Season Window", "value": 'rolling_2'},
+                                              {"label": "Best 3 Season Window", "value": 'rolling_3'},
                                           ],
                                           multi=False,
-                                          value="2024",
+                                          value='total',
+                                          clearable=False,
                                           ),
-                         ], style={'width': "20%", 'display': 'inline-block'}
+                         ], style={'width': "40%", 'display': 'none'}
                          ),
 
                 #Graph dropdown
@@ -76,7 +112,10 @@ class NHLView:
                              dcc.Dropdown(id="select_graph",
                                           options=[
                                               {"label": "Bar", "value": "bar"},
-                                              {"label": "Scatter", "value": "scatter"}
+                                              {"label": "Scatter", "value": "scatter"},
+                                              {"label": "League Presets", "value": "presets"},
+                                              {"label": "Best Lineup", "value": "lineup"},
+                                              {"label": "Team Comparison", "value": "teams"}
                                           ],
                                           multi=False,
                                           value="bar",
@@ -149,6 +188,7 @@ class NHLView:
                                  html.H5("5on5 Goal:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_goal',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_goal'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -156,6 +196,7 @@ class NHLView:
                                  html.H5("PPG:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_ppg',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_ppg'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -163,6 +204,7 @@ class NHLView:
                                  html.H5("SHG:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_shg',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_shg'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -170,6 +212,7 @@ class NHLView:
                                  html.H5("SOG:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_sog',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_sog'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            )
@@ -182,6 +225,7 @@ class NHLView:
                                  html.H5("5on5 Assist:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_assist',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_assist'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -189,6 +233,7 @@ class NHLView:
                                  html.H5("PPA:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_ppa',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_ppa'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -196,6 +241,7 @@ class NHLView:
                                  html.H5("SHA:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_sha',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_sha'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -203,6 +249,7 @@ class NHLView:
                                  html.H5("Faceoff Wins:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_faceoff_win',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_faceoff_win'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            )
@@ -214,6 +261,7 @@ class NHLView:
                                  html.H5("Takeaways:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_takeaway',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_takeaway'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -221,6 +269,7 @@ class NHLView:
                                  html.H5("Giveaways:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_giveaway',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_giveaway'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -228,6 +277,7 @@ class NHLView:
                                  html.H5("Hits:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_hit',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_hit'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            ),
@@ -235,11 +285,17 @@ class NHLView:
                                  html.H5("Blocks:", style={'margin-right': '5px'}),
                                  dcc.Input(id='f_block',
                                            type='number',
+                                           debounce=debounce,
                                            value=self.fantasy_model.f_scoring['f_block'],
                                            style={'width': '20%', 'display': 'inline-block', 'margin-right': '10px'}
                                            )
                              ], style={'display': 'flex', 'align-items': 'center'}
                              ),
+
+                             #Applies the edited scoring values in one update
+                             html.Button("Apply Scoring", id='apply_scoring', n_clicks=0,
+                                         style={'display': 'inline-block' if self.scoring_update == 'apply'
+                                                else 'none'}),
                          ]),
 
                 # Slider to represent number of players
@@ -256,10 +312,38 @@ class NHLView:
                                )
                 ], id='slider_container'),
 
-                html.Div(id='output_container')
+                #This session's fantasy scoring values, kept in the browser rather than on the server
+                dcc.Store(id='scoring_store', data=self.fantasy_model.f_scoring),
+
+                #Stat dropdown options of real and fantasy data, read by the browser when switching between them
+                dcc.Store(id='stat_options', data={'real': self.nhl_model.all_options,
+                                                   'counting': self.nhl_model.counting_options,
+                                                   'fantasy': self.fantasy_model.f_options}),
+
+                #Selections the displayed figure's traces were built for, tells the graph callback when it can
+                #update the figure in place instead of sending a new one
+                dcc.Store(id='figure_state'),
+
+                #The graph stays in the layout, callbacks only replace its figure or patch parts of it
+                html.Div([
+                    dcc.Graph(id='output_graph', figure={})
+                ], id='output_container')
             ])
         ])
 
+    def serve_layout(self):
+        """
+        Gets the layout served on each page load, the shared layout plus a new session id
+
+        Returns:
+            html.Div: The page layout
+        """
+        return html.Div([
+            #Identifies this page's requests, used to coalesce its rapid scoring changes
+            dcc.Store(id='session_id', data=uuid.uuid4().hex),
+            self.layout
+        ])
+
     def create_app(self):
         """
         Creates + Returns a Dash app instance
@@ -268,5 +352,5 @@ class NHLView:
             app: A configured Dash app instance
         """
         app = dash.Dash(__name__)
-        app.layout = self.layout
+        app.layout = self.serve_layout
         return app
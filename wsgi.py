@@ -0,0 +1,37 @@
+"""
+Production entry point, serves the app with a multi-worker WSGI server instead of the Dash development server
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Every season is loaded and indexed when this module is imported. With preload_app (gunicorn.conf.py) that happens
+once in the master process before the workers are forked, so the workers share the season data copy-on-write.
+Debug mode is off, Dash only enables it when run through NHLApp.run.
+
+Environment:
+    NHL_DATA_DIR: Directory holding the skaters_XX.csv season files (default: the working directory)
+    NHL_CACHE_DIR: Directory of the binary season snapshots (default: .season_cache)
+    NHL_FIGURE_CACHE_DIR: Directory of the figure cache shared by the workers (default: one cache per worker)
+    NHL_COALESCE_SECONDS: Settle window of a session's scoring changes (default: 0.15 with a single worker, off with
+                          several, whose coalescing only works with sticky sessions, see RequestCoalescer)
+"""
+import logging
+import os
+
+from nhl_app import NHLApp
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s %(process)d %(name)s %(levelname)s %(message)s')
+
+#Same default worker count as gunicorn.conf.py
+workers = int(os.environ.get('NHL_WORKERS', 4))
+
+nhl_app = NHLApp(
+    data_dir=os.environ.get('NHL_DATA_DIR', '.'),
+    cache_dir=os.environ.get('NHL_CACHE_DIR', '.season_cache'),
+    preload=None,
+    figure_cache_dir=os.environ.get('NHL_FIGURE_CACHE_DIR'),
+    coalesce_seconds=float(os.environ.get('NHL_COALESCE_SECONDS', 0.15 if workers == 1 else 0)),
+)
+nhl_app.warm()
+
+#The Flask server is the WSGI application
+server = nhl_app.app.server